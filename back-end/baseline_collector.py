@@ -6,16 +6,175 @@ Processes images to extract joint landmarks and stores them as the baseline for
 
 import os
 import json
+import math
 import cv2
 import numpy as np
+import multiprocessing
+import threading
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from drawingLines import process_image_landmarks, decode_base64_image
+
+try:
+    import orjson
+except ImportError:  # Optional; falls back to the stdlib json module
+    orjson = None
+
+from drawingLines import (
+    process_image_landmarks_array,
+    decode_base64_image,
+    get_pose_landmarker
+)
+
+
+# Default location of the saved baseline file
+_DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), 'output', 'baseline_data.json')
+
+# Landmark layout used when packing samples into arrays
+ARM_NAMES = ('left_arm', 'right_arm')
+JOINT_NAMES = ('shoulder', 'elbow', 'wrist')
+ANGLE_NAMES = ('elbow_angle', 'shoulder_angle')
+
+# Number of images read and decoded ahead of the one being processed
+PREFETCH_DEPTH = 2
+
+
+@dataclass
+class Sample:
+    """Packed landmarks extracted from a single baseline image."""
+    landmarks: np.ndarray  # (arms, joints, 3) pixel x, y, visibility
+    shape: Tuple[int, int]  # (width, height) of the image the landmarks refer to
+    filename: str
+
+
+# Per-thread file buffer reused across image reads
+_read_buffers = threading.local()
+
+
+def _read_image(image_path: str) -> Optional[np.ndarray]:
+    """
+    Read an image file in one sequential read and decode it in memory.
+    
+    cv2.imread streams the file in small chunks, which is slow on network storage.
+    The file is read into a per-thread buffer that grows geometrically, so
+    a batch of images does not allocate a new bytes object for each file.
+    """
+    with open(image_path, 'rb', buffering=1 << 20) as f:
+        size = os.fstat(f.fileno()).st_size
+        buffer = getattr(_read_buffers, 'buffer', None)
+        if buffer is None or buffer.size < size:
+            buffer = np.empty(max(size, 2 * buffer.size if buffer is not None else 0),
+                              dtype=np.uint8)
+            _read_buffers.buffer = buffer
+        
+        num_read = f.readinto(buffer[:size])
+    
+    return cv2.imdecode(buffer[:num_read], cv2.IMREAD_COLOR)
+
+
+def _prefetch_images(image_paths: List[str], depth: int = PREFETCH_DEPTH):
+    """
+    Yield (path, future) pairs while the next images decode in the background.
+    
+    File reads and libjpeg/libpng decoding release the GIL, so threads overlap
+    them with MediaPipe inference on the current image.
+    """
+    with ThreadPoolExecutor(max_workers=depth) as executor:
+        remaining = iter(image_paths)
+        pending = deque()
+        
+        for image_path in remaining:
+            pending.append((image_path, executor.submit(_read_image, image_path)))
+            if len(pending) >= depth:
+                break
+        
+        while pending:
+            image_path, future = pending.popleft()
+            next_path = next(remaining, None)
+            if next_path is not None:
+                pending.append((next_path, executor.submit(_read_image, next_path)))
+            yield image_path, future
+
+
+def _dumps(obj, indent: bool = False) -> bytes:
+    """Encode an object as JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    
+    # Compact output keeps the stdlib fallback reasonably fast
+    return json.dumps(obj).encode('utf-8')
+
+
+def joint_angle(point1: Tuple[float, float],
+                point2: Tuple[float, float],
+                point3: Tuple[float, float]) -> float:
+    """
+    Calculate the angle at point2 formed by point1-point2-point3.
+    
+    Shared by baseline collection and pose comparison so both sides compute
+    identical angles. Returns angle in degrees (0-180).
+    """
+    dx1, dy1 = point1[0] - point2[0], point1[1] - point2[1]
+    dx2, dy2 = point3[0] - point2[0], point3[1] - point2[1]
+    
+    # atan2(cross, dot) stays stable near 0/180 degrees without clipping
+    angle = math.atan2(dx1 * dy2 - dy1 * dx2, dx1 * dx2 + dy1 * dy2)
+    
+    return abs(math.degrees(angle))
+
+
+def angle_from_vertical(point1: Tuple[float, float],
+                        point2: Tuple[float, float]) -> float:
+    """
+    Calculate the angle of the line from point1 to point2 relative to vertical.
+    
+    Returns angle in degrees (-180 to 180).
+    """
+    dx = point2[0] - point1[0]
+    dy = point2[1] - point1[1]
+    
+    # Angle from vertical (positive y is down in image coordinates)
+    return math.degrees(math.atan2(dx, dy))
+
+
+def load_json(path: str):
+    """Read and decode a JSON file, using orjson when it is installed."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Per-process collector used by the baseline worker pool
+_worker_collector = None
+
+
+def _init_worker(baseline_folder: str):
+    """Build the MediaPipe pose landmarker once per worker process."""
+    global _worker_collector
+    _worker_collector = BaselineCollector(baseline_folder)
+    _worker_collector.get_pose_landmarker()
+
+
+def _extract_in_worker(image_paths: List[str]) -> List[Optional[Sample]]:
+    """Extract landmarks for a chunk of images inside a worker process."""
+    return list(_worker_collector._extract_sequential(image_paths))
 
 
 class BaselineCollector:
     """Collects and manages baseline pose data from reference images."""
     
+    # Output directories already created by save_baseline in this process
+    _ensured_dirs = set()
+    
     def __init__(self, baseline_folder: str, output_path: str = None):
         """
         Initialize the baseline collector.
@@ -25,23 +184,31 @@ class BaselineCollector:
             output_path: Path to save the baseline data JSON file
         """
         self.baseline_folder = baseline_folder
-        self.output_path = output_path or os.path.join(
-            os.path.dirname(__file__), 'output', 'baseline_data.json'
-        )
-        self.supported_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.webp'}
+        self.output_path = output_path or _DEFAULT_OUTPUT
+        self.supported_extensions = {'jpg', 'jpeg', 'png', 'bmp', 'webp'}
+        self._pose_landmarker = None
+    
+    def get_pose_landmarker(self):
+        """Get the pose landmarker held for the lifetime of this collector."""
+        if self._pose_landmarker is None:
+            self._pose_landmarker = get_pose_landmarker()
+        return self._pose_landmarker
         
     def get_image_files(self) -> List[str]:
         """Get all supported image files from the baseline folder."""
         if not os.path.exists(self.baseline_folder):
             raise FileNotFoundError(f"Baseline folder not found: {self.baseline_folder}")
         
-        image_files = []
-        for filename in os.listdir(self.baseline_folder):
-            ext = os.path.splitext(filename)[1].lower()
-            if ext in self.supported_extensions:
-                image_files.append(os.path.join(self.baseline_folder, filename))
+        # DirEntry.path is already joined and is_file() uses the cached d_type
+        with os.scandir(self.baseline_folder) as entries:
+            image_files = [
+                entry.path for entry in entries
+                if entry.is_file()
+                and entry.name.rpartition('.')[2].lower() in self.supported_extensions
+            ]
         
-        return sorted(image_files)
+        image_files.sort()
+        return image_files
     
     def extract_landmarks_from_image(self, image_path: str) -> Optional[Dict]:
         """
@@ -53,26 +220,54 @@ class BaselineCollector:
         Returns:
             Dictionary containing landmark data or None if detection failed
         """
+        sample = self.extract_landmarks_array(image_path)
+        if sample is None:
+            return None
+        
+        width, height = sample.shape
+        return {
+            'filename': sample.filename,
+            'image_shape': {
+                'height': height,
+                'width': width
+            },
+            'landmarks': self._landmarks_to_dict(sample.landmarks),
+            'arms_detected': True
+        }
+    
+    def extract_landmarks_array(self, image_path: str) -> Optional[Sample]:
+        """
+        Extract pose landmarks from a single image as a packed array.
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            Sample with the packed pixel landmarks, or None if detection failed
+        """
+        try:
+            image = _read_image(image_path)
+        except Exception as e:
+            print(f"Error processing {image_path}: {str(e)}")
+            return None
+        
+        return self._extract_decoded(image_path, image)
+    
+    def _extract_decoded(self, image_path: str, image: Optional[np.ndarray]) -> Optional[Sample]:
+        """Extract packed pose landmarks from an image that has already been decoded."""
         try:
-            image = cv2.imread(image_path)
             if image is None:
                 print(f"Warning: Could not read image: {image_path}")
                 return None
             
-            result = process_image_landmarks(image)
+            landmarks = process_image_landmarks_array(image, self.get_pose_landmarker())
             
-            if result.get('pose_detected') and result.get('landmarks'):
-                return {
-                    'filename': os.path.basename(image_path),
-                    'image_shape': {
-                        'height': image.shape[0],
-                        'width': image.shape[1]
-                    },
-                    'landmarks': result['landmarks'],
-                    'arms_detected': result.get('arms_detected', False),
-                    'hands_detected': result.get('hands_detected', False),
-                    'num_hands': result.get('num_hands', 0)
-                }
+            if landmarks is not None:
+                return Sample(
+                    landmarks=landmarks,
+                    shape=(image.shape[1], image.shape[0]),
+                    filename=os.path.basename(image_path)
+                )
             else:
                 print(f"Warning: No pose detected in: {image_path}")
                 return None
@@ -81,6 +276,19 @@ class BaselineCollector:
             print(f"Error processing {image_path}: {str(e)}")
             return None
     
+    def _extract_sequential(self, image_paths: List[str]):
+        """Extract landmarks image by image, decoding upcoming images in the background."""
+        for image_path, future in _prefetch_images(image_paths):
+            print(f"Processing: {os.path.basename(image_path)}")
+            try:
+                image = future.result()
+            except Exception as e:
+                print(f"Error processing {image_path}: {str(e)}")
+                yield None
+                continue
+            
+            yield self._extract_decoded(image_path, image)
+    
     def normalize_landmarks(self, landmarks: Dict, image_width: int, image_height: int) -> Dict:
         """
         Normalize landmark coordinates to 0-1 range for scale-invariant comparison.
@@ -93,6 +301,8 @@ class BaselineCollector:
         Returns:
             Normalized landmark data
         """
+        # Plain float division keeps every joint and full precision; the packed
+        # float32 path is only for batches in collect_baseline
         normalized = {}
         
         for arm_name, arm_data in landmarks.items():
@@ -106,6 +316,21 @@ class BaselineCollector:
         
         return normalized
     
+    def _normalize_stacked(self, stacked: np.ndarray, shapes: np.ndarray) -> np.ndarray:
+        """
+        Normalize stacked pixel landmarks by their per-sample (width, height).
+        
+        Args:
+            stacked: (N, arms, joints, 3) array of pixel x, y and visibility
+            shapes: (N, 2) array of image (width, height)
+            
+        Returns:
+            Normalized copy of the stacked landmarks
+        """
+        normalized = stacked.copy()
+        normalized[..., :2] /= shapes[:, None, None, :]
+        return normalized
+    
     def calculate_joint_angles(self, landmarks: Dict) -> Dict:
         """
         Calculate angles at each joint for pose comparison.
@@ -127,14 +352,14 @@ class BaselineCollector:
                 wrist = arm_data['wrist']
                 
                 # Calculate elbow angle (angle at elbow between shoulder and wrist)
-                elbow_angle = self._calculate_angle(
+                elbow_angle = joint_angle(
                     (shoulder['x'], shoulder['y']),
                     (elbow['x'], elbow['y']),
                     (wrist['x'], wrist['y'])
                 )
                 
                 # Calculate shoulder angle (angle of upper arm relative to vertical)
-                shoulder_angle = self._calculate_angle_from_vertical(
+                shoulder_angle = angle_from_vertical(
                     (shoulder['x'], shoulder['y']),
                     (elbow['x'], elbow['y'])
                 )
@@ -146,44 +371,43 @@ class BaselineCollector:
         
         return angles
     
-    def _calculate_angle(self, point1: Tuple[float, float], 
-                         point2: Tuple[float, float], 
-                         point3: Tuple[float, float]) -> float:
-        """
-        Calculate the angle at point2 formed by point1-point2-point3.
-        
-        Returns angle in degrees (0-180).
-        """
-        v1 = np.array([point1[0] - point2[0], point1[1] - point2[1]])
-        v2 = np.array([point3[0] - point2[0], point3[1] - point2[1]])
-        
-        cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2) + 1e-6)
-        cos_angle = np.clip(cos_angle, -1.0, 1.0)
-        angle = np.arccos(cos_angle)
-        
-        return np.degrees(angle)
-    
-    def _calculate_angle_from_vertical(self, point1: Tuple[float, float], 
-                                        point2: Tuple[float, float]) -> float:
+    def _extract_all(self, image_files: List[str], max_workers: Optional[int] = None):
         """
-        Calculate the angle of the line from point1 to point2 relative to vertical.
+        Extract landmarks from every image, in input order.
         
-        Returns angle in degrees (-180 to 180).
+        MediaPipe inference is CPU-bound, so chunks of images are spread across
+        worker processes. Each worker builds its own landmarkers (MediaPipe graphs
+        are not fork-safe, hence the spawn context).
         """
-        dx = point2[0] - point1[0]
-        dy = point2[1] - point1[1]
-        
-        # Angle from vertical (positive y is down in image coordinates)
-        angle = np.degrees(np.arctan2(dx, dy))
-        
-        return angle
+        workers = min(max_workers or os.cpu_count() or 1, len(image_files))
+        
+        if workers <= 1:
+            yield from self._extract_sequential(image_files)
+            return
+        
+        # Several chunks per worker keeps the load balanced when image sizes vary
+        chunk_size = math.ceil(len(image_files) / (workers * 4))
+        chunks = [image_files[i:i + chunk_size] for i in range(0, len(image_files), chunk_size)]
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.baseline_folder,)
+        ) as executor:
+            for results in executor.map(_extract_in_worker, chunks):
+                yield from results
     
-    def collect_baseline(self, aggregate_method: str = 'average') -> Dict:
+    def collect_baseline(self, aggregate_method: str = 'average',
+                         max_workers: Optional[int] = None,
+                         include_samples: bool = False) -> Dict:
         """
         Collect baseline data from all images in the baseline folder.
         
         Args:
             aggregate_method: How to aggregate multiple images ('average', 'median', 'first', 'all')
+            max_workers: Number of worker processes (defaults to the CPU count)
+            include_samples: Also keep every normalized sample alongside the aggregate
             
         Returns:
             Baseline data dictionary
@@ -195,127 +419,168 @@ class BaselineCollector:
         
         print(f"Found {len(image_files)} images in baseline folder")
         
-        all_landmarks = []
-        all_angles = []
+        raw_landmarks = []
+        shapes = []
         processed_files = []
         
-        for image_path in image_files:
-            print(f"Processing: {os.path.basename(image_path)}")
-            result = self.extract_landmarks_from_image(image_path)
-            
-            if result:
-                # Normalize landmarks
-                normalized = self.normalize_landmarks(
-                    result['landmarks'],
-                    result['image_shape']['width'],
-                    result['image_shape']['height']
-                )
-                
-                # Calculate angles
-                angles = self.calculate_joint_angles(normalized)
-                
-                all_landmarks.append(normalized)
-                all_angles.append(angles)
-                processed_files.append(result['filename'])
+        for sample in self._extract_all(image_files, max_workers):
+            if sample is not None:
+                raw_landmarks.append(sample.landmarks)
+                shapes.append(sample.shape)
+                processed_files.append(sample.filename)
         
-        if not all_landmarks:
+        if not raw_landmarks:
             raise ValueError("No valid pose data extracted from any images")
         
-        print(f"Successfully processed {len(all_landmarks)} images")
+        print(f"Successfully processed {len(raw_landmarks)} images")
+        
+        # Normalize every sample in one broadcast, then calculate angles in one pass
+        stacked = self._normalize_stacked(
+            np.stack(raw_landmarks),
+            np.array(shapes, dtype=np.float32)
+        )
+        angle_array = self._batch_joint_angles(stacked)
         
         # Aggregate the data
         if aggregate_method == 'first':
-            aggregated_landmarks = all_landmarks[0]
-            aggregated_angles = all_angles[0]
+            aggregated_landmarks = self._landmarks_to_dict(stacked[0])
+            aggregated_angles = self._angles_to_dict(angle_array[0])
         elif aggregate_method == 'all':
-            aggregated_landmarks = all_landmarks
-            aggregated_angles = all_angles
+            aggregated_landmarks = [self._landmarks_to_dict(landmarks) for landmarks in stacked]
+            aggregated_angles = [self._angles_to_dict(angles) for angles in angle_array]
         else:
-            aggregated_landmarks = self._aggregate_landmarks(all_landmarks, aggregate_method)
-            aggregated_angles = self._aggregate_angles(all_angles, aggregate_method)
+            aggregated_landmarks = self._aggregate_landmarks(stacked, aggregate_method)
+            aggregated_angles = self._aggregate_angles(angle_array, aggregate_method)
         
         baseline_data = {
             'metadata': {
                 'created_at': datetime.now().isoformat(),
                 'source_folder': self.baseline_folder,
-                'num_images_processed': len(all_landmarks),
+                'num_images_processed': len(processed_files),
                 'processed_files': processed_files,
                 'aggregate_method': aggregate_method
             },
             'baseline_landmarks': aggregated_landmarks,
             'baseline_angles': aggregated_angles,
-            'individual_samples': [
-                {'landmarks': lm, 'angles': ang} 
-                for lm, ang in zip(all_landmarks, all_angles)
-            ] if aggregate_method != 'all' else None
+            # Kept as arrays here; expanded to per-sample dicts by save_baseline
+            'individual_samples': {
+                'landmarks': stacked,
+                'angles': angle_array
+            } if include_samples and aggregate_method != 'all' else None
         }
         
         return baseline_data
     
-    def _aggregate_landmarks(self, all_landmarks: List[Dict], method: str) -> Dict:
-        """Aggregate multiple landmark samples into a single baseline."""
+    def _batch_joint_angles(self, stacked: np.ndarray) -> np.ndarray:
+        """
+        Calculate elbow and shoulder angles for every stacked sample at once.
+        
+        Returns a (N, arms, angles) array in degrees, ordered like ANGLE_NAMES.
+        Arms with a missing joint come out as NaN.
+        """
+        shoulder = stacked[:, :, 0, :2]
+        elbow = stacked[:, :, 1, :2]
+        wrist = stacked[:, :, 2, :2]
+        
+        # Elbow angle between shoulder and wrist, via atan2(cross, dot)
+        v1 = shoulder - elbow
+        v2 = wrist - elbow
+        cross = v1[..., 0] * v2[..., 1] - v1[..., 1] * v2[..., 0]
+        dot = (v1 * v2).sum(axis=-1)
+        elbow_angle = np.abs(np.degrees(np.arctan2(cross, dot)))
+        
+        # Upper arm angle relative to vertical (positive y is down)
+        upper_arm = elbow - shoulder
+        shoulder_angle = np.degrees(np.arctan2(upper_arm[..., 0], upper_arm[..., 1]))
+        
+        return np.stack([elbow_angle, shoulder_angle], axis=-1)
+    
+    def _landmarks_to_dict(self, landmarks: np.ndarray) -> Dict:
+        """Convert one (arms, joints, 3) sample back into the nested landmark dict."""
+        # tolist() yields plain floats, so the loop avoids per-scalar NumPy calls
+        values = landmarks.tolist()
+        return {
+            arm_name: {
+                joint_name: {'x': x, 'y': y, 'visibility': visibility}
+                for joint_name, (x, y, visibility) in zip(JOINT_NAMES, values[a])
+                if not math.isnan(x)
+            }
+            for a, arm_name in enumerate(ARM_NAMES)
+        }
+    
+    def _angles_to_dict(self, angles: np.ndarray) -> Dict:
+        """Convert one (arms, angles) sample back into the nested angle dict."""
+        values = angles.tolist()
+        return {
+            arm_name: dict(zip(ANGLE_NAMES, values[a]))
+            for a, arm_name in enumerate(ARM_NAMES)
+            if not any(math.isnan(v) for v in values[a])
+        }
+    
+    def _reduce_samples(self, stacked: np.ndarray, method: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Reduce stacked samples along the sample axis into (center, std)."""
+        with warnings.catch_warnings():
+            # Joints missing from every sample produce all-NaN slices
+            warnings.simplefilter('ignore', RuntimeWarning)
+            if method == 'median':
+                if np.isnan(stacked).any():
+                    center = np.nanmedian(stacked, axis=0)
+                else:
+                    center = self._partition_median(stacked)
+            else:  # average
+                center = np.nanmean(stacked, axis=0)
+            std = np.nanstd(stacked, axis=0)
+        
+        return center, std
+    
+    def _partition_median(self, stacked: np.ndarray) -> np.ndarray:
+        """Median along the sample axis using a single partial sort."""
+        count = stacked.shape[0]
+        mid = count // 2
+        
+        if count % 2:
+            return np.partition(stacked, mid, axis=0)[mid]
+        
+        partitioned = np.partition(stacked, (mid - 1, mid), axis=0)
+        return 0.5 * (partitioned[mid - 1] + partitioned[mid])
+    
+    def _aggregate_landmarks(self, stacked: np.ndarray, method: str) -> Dict:
+        """Aggregate stacked landmark samples into a single baseline."""
+        center, std = self._reduce_samples(stacked, method)
+        center, std = center.tolist(), std.tolist()
         aggregated = {}
         
-        for arm_name in ['left_arm', 'right_arm']:
+        for a, arm_name in enumerate(ARM_NAMES):
             aggregated[arm_name] = {}
             
-            for joint_name in ['shoulder', 'elbow', 'wrist']:
-                x_values = []
-                y_values = []
-                vis_values = []
-                
-                for landmarks in all_landmarks:
-                    if arm_name in landmarks and joint_name in landmarks[arm_name]:
-                        joint = landmarks[arm_name][joint_name]
-                        x_values.append(joint['x'])
-                        y_values.append(joint['y'])
-                        vis_values.append(joint.get('visibility', 1.0))
-                
-                if x_values:
-                    if method == 'median':
-                        aggregated[arm_name][joint_name] = {
-                            'x': float(np.median(x_values)),
-                            'y': float(np.median(y_values)),
-                            'visibility': float(np.median(vis_values)),
-                            'std_x': float(np.std(x_values)),
-                            'std_y': float(np.std(y_values))
-                        }
-                    else:  # average
-                        aggregated[arm_name][joint_name] = {
-                            'x': float(np.mean(x_values)),
-                            'y': float(np.mean(y_values)),
-                            'visibility': float(np.mean(vis_values)),
-                            'std_x': float(np.std(x_values)),
-                            'std_y': float(np.std(y_values))
-                        }
+            for j, joint_name in enumerate(JOINT_NAMES):
+                x, y, visibility = center[a][j]
+                if not math.isnan(x):
+                    aggregated[arm_name][joint_name] = {
+                        'x': x,
+                        'y': y,
+                        'visibility': visibility,
+                        'std_x': std[a][j][0],
+                        'std_y': std[a][j][1]
+                    }
         
         return aggregated
     
-    def _aggregate_angles(self, all_angles: List[Dict], method: str) -> Dict:
-        """Aggregate multiple angle samples into a single baseline."""
+    def _aggregate_angles(self, angle_array: np.ndarray, method: str) -> Dict:
+        """Aggregate stacked angle samples into a single baseline."""
+        center, std = self._reduce_samples(angle_array, method)
+        center, std = center.tolist(), std.tolist()
         aggregated = {}
         
-        for arm_name in ['left_arm', 'right_arm']:
+        for a, arm_name in enumerate(ARM_NAMES):
             aggregated[arm_name] = {}
             
-            for angle_name in ['elbow_angle', 'shoulder_angle']:
-                values = []
-                
-                for angles in all_angles:
-                    if arm_name in angles and angle_name in angles[arm_name]:
-                        values.append(angles[arm_name][angle_name])
-                
-                if values:
-                    if method == 'median':
-                        aggregated[arm_name][angle_name] = {
-                            'value': float(np.median(values)),
-                            'std': float(np.std(values))
-                        }
-                    else:  # average
-                        aggregated[arm_name][angle_name] = {
-                            'value': float(np.mean(values)),
-                            'std': float(np.std(values))
-                        }
+            for k, angle_name in enumerate(ANGLE_NAMES):
+                if not math.isnan(center[a][k]):
+                    aggregated[arm_name][angle_name] = {
+                        'value': center[a][k],
+                        'std': std[a][k]
+                    }
         
         return aggregated
     
@@ -329,10 +594,35 @@ class BaselineCollector:
         Returns:
             Path to the saved file
         """
-        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
-        
-        with open(self.output_path, 'w') as f:
-            json.dump(baseline_data, f, indent=4)
+        output_dir = os.path.dirname(self.output_path)
+        if output_dir and output_dir not in BaselineCollector._ensured_dirs:
+            os.makedirs(output_dir, exist_ok=True)
+            BaselineCollector._ensured_dirs.add(output_dir)
+        
+        samples = baseline_data.get('individual_samples')
+        streamed = isinstance(samples, dict)
+        if streamed:
+            baseline_data = {
+                key: value for key, value in baseline_data.items()
+                if key != 'individual_samples'
+            }
+        
+        with open(self.output_path, 'wb') as f:
+            header = _dumps(baseline_data, indent=True)
+            
+            if not streamed:
+                f.write(header)
+            else:
+                # Encode samples one at a time rather than building the full list first
+                f.write(header[:header.rindex(b'}')].rstrip())
+                f.write(b',\n  "individual_samples": [')
+                for i, (landmarks, angles) in enumerate(zip(samples['landmarks'], samples['angles'])):
+                    f.write(b'\n    ' if i == 0 else b',\n    ')
+                    f.write(_dumps({
+                        'landmarks': self._landmarks_to_dict(landmarks),
+                        'angles': self._angles_to_dict(angles)
+                    }))
+                f.write(b'\n  ]\n}')
         
         print(f"Baseline data saved to: {self.output_path}")
         return self.output_path
@@ -352,13 +642,14 @@ class BaselineCollector:
         if not os.path.exists(load_path):
             raise FileNotFoundError(f"Baseline file not found: {load_path}")
         
-        with open(load_path, 'r') as f:
-            return json.load(f)
+        return load_json(load_path)
 
 
 def collect_baseline_from_folder(folder_path: str, 
                                   output_path: str = None,
-                                  aggregate_method: str = 'average') -> Dict:
+                                  aggregate_method: str = 'average',
+                                  max_workers: Optional[int] = None,
+                                  include_samples: bool = False) -> Dict:
     """
     Convenience function to collect baseline data from a folder.
     
@@ -366,12 +657,14 @@ def collect_baseline_from_folder(folder_path: str,
         folder_path: Path to folder containing baseline images
         output_path: Path to save the baseline JSON (optional)
         aggregate_method: How to aggregate ('average', 'median', 'first', 'all')
+        max_workers: Number of worker processes (defaults to the CPU count)
+        include_samples: Also store every normalized sample in the baseline file
         
     Returns:
         Baseline data dictionary
     """
     collector = BaselineCollector(folder_path, output_path)
-    baseline_data = collector.collect_baseline(aggregate_method)
+    baseline_data = collector.collect_baseline(aggregate_method, max_workers, include_samples)
     collector.save_baseline(baseline_data)
     return baseline_data
 
@@ -390,6 +683,11 @@ if __name__ == '__main__':
                         choices=['average', 'median', 'first', 'all'],
                         default='average',
                         help='Aggregation method for multiple images')
+    parser.add_argument('--workers', '-w', type=int,
+                        default=None,
+                        help='Number of worker processes (defaults to CPU count)')
+    parser.add_argument('--include-samples', action='store_true',
+                        help='Also store every individual sample in the baseline file')
     
     args = parser.parse_args()
     
@@ -399,7 +697,9 @@ if __name__ == '__main__':
     baseline = collect_baseline_from_folder(
         args.folder, 
         args.output, 
-        args.method
+        args.method,
+        args.workers,
+        args.include_samples
     )
     
     print("\nBaseline Summary:")
@@ -6,6 +6,8 @@ Provides Flask endpoints for real-time pose accuracy checking.
 
 import os
 import json
+import math
+import threading
 import cv2
 import numpy as np
 import base64
@@ -13,15 +15,23 @@ from io import BytesIO
 from PIL import Image
 from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from waitress import serve
+except ImportError:  # Optional; falls back to the Flask development server
+    serve = None
 
 from baseline_collector import BaselineCollector, collect_baseline_from_folder
-from pose_comparator import PoseComparator, compare_pose_to_baseline, AccuracyLevel
+from json_provider import OrjsonProvider
+from pose_comparator import PoseComparator, compare_pose_to_baseline, AccuracyLevel, image_digest
 from drawingLines import (
     process_image, 
     process_image_landmarks, 
+    warmup,
     decode_base64_image,
-    encode_image_to_base64,
+    decode_uploaded_image,
     ARM_LINE_COLOR,
     ARM_LINE_THICKNESS,
     POINT_COLOR,
@@ -29,11 +39,15 @@ from drawingLines import (
 )
 
 app = Flask(__name__)
-CORS(app)
+app.json = OrjsonProvider(app)
+app.json.sort_keys = False  # Clients never rely on key order; skip sorting every response
+# Expose the flag header so browsers can read /compare-pose-visual-raw results
+CORS(app, expose_headers=['X-Accuracy-Flag'])
 
 # Global comparator instance (loaded on first use)
 _comparator: Optional[PoseComparator] = None
 _baseline_loaded = False
+_comparator_lock = threading.Lock()
 
 # Default paths
 DEFAULT_BASELINE_FOLDER = os.path.join(os.path.dirname(__file__), 'baseline_images')
@@ -44,25 +58,96 @@ CORRECT_COLOR = (0, 255, 0)    # Green for correct pose
 INCORRECT_COLOR = (0, 0, 255)  # Red for incorrect pose
 WARNING_COLOR = (0, 165, 255)  # Orange for fair accuracy
 
+# Baseline overlay geometry per (width, height), for the baseline in _baseline_pixel_source
+_baseline_pixel_cache: Dict[Tuple[int, int], Tuple[List[Tuple[int, int]], Optional[np.ndarray]]] = {}
+_baseline_pixel_source: Optional[Dict] = None
+
+# Per-thread output frame reused by draw_comparison_overlay
+_overlay_buffers = threading.local()
+
+# Results for the most recent frames, so repeated (stalled webcam) frames skip inference
+FRAME_CACHE_SIZE = 4
+_frame_cache: "OrderedDict[Tuple, object]" = OrderedDict()
+_frame_cache_lock = threading.Lock()
+
+# JPEG quality for overlay images (overridable per request with ?quality=)
+JPEG_QUALITY = 80
+
 
 def get_comparator() -> PoseComparator:
     """Get or create the global pose comparator instance."""
     global _comparator, _baseline_loaded
     
-    if _comparator is None:
-        _comparator = PoseComparator(baseline_path=DEFAULT_BASELINE_FILE)
+    # Fast path once loaded; the lock only guards first-time setup
+    if _baseline_loaded:
+        return _comparator
     
-    if not _baseline_loaded and os.path.exists(DEFAULT_BASELINE_FILE):
-        try:
-            _comparator.load_baseline()
-            _baseline_loaded = True
-            print(f"Baseline loaded from: {DEFAULT_BASELINE_FILE}")
-        except Exception as e:
-            print(f"Warning: Could not load baseline: {e}")
+    with _comparator_lock:
+        if _comparator is None:
+            _comparator = PoseComparator(baseline_path=DEFAULT_BASELINE_FILE)
+        
+        if not _baseline_loaded and os.path.exists(DEFAULT_BASELINE_FILE):
+            try:
+                _comparator.load_baseline()
+                _baseline_loaded = True
+                print(f"Baseline loaded from: {DEFAULT_BASELINE_FILE}")
+            except Exception as e:
+                print(f"Warning: Could not load baseline: {e}")
     
     return _comparator
 
 
+def _frame_key(endpoint: str, image: np.ndarray, *extra, digest=None) -> Optional[Tuple]:
+    """
+    Cache key for a decoded frame: the endpoint, pixel hash and any response options.
+    
+    Frames too large to hash (see pose_comparator.HASH_MAX_BYTES) get None
+    and are not cached.
+    """
+    if digest is None:
+        digest = image_digest(image)
+    if digest is None:
+        return None
+    return (endpoint, image.shape, digest) + extra
+
+
+def _get_cached_frame(key: Optional[Tuple]):
+    """Get the cached response data for a frame, or None."""
+    if key is None:
+        return None
+    with _frame_cache_lock:
+        value = _frame_cache.get(key)
+        if value is not None:
+            _frame_cache.move_to_end(key)
+        return value
+
+
+def _cache_frame(key: Optional[Tuple], value):
+    """Cache response data for a frame, evicting the least recently used."""
+    if key is None:
+        return
+    with _frame_cache_lock:
+        _frame_cache[key] = value
+        _frame_cache.move_to_end(key)
+        while len(_frame_cache) > FRAME_CACHE_SIZE:
+            _frame_cache.popitem(last=False)
+
+
+def clear_frame_cache():
+    """Drop cached frame results; call whenever the baseline or thresholds change."""
+    with _frame_cache_lock:
+        _frame_cache.clear()
+
+
+def _get_overlay_buffer(image: np.ndarray) -> np.ndarray:
+    """Get this thread's overlay buffer, reallocating only when the frame shape changes."""
+    buffer = getattr(_overlay_buffers, 'frame', None)
+    if buffer is None or buffer.shape != image.shape or buffer.dtype != image.dtype:
+        buffer = np.empty_like(image)
+        _overlay_buffers.frame = buffer
+    return buffer
+
+
 def draw_comparison_overlay(image: np.ndarray, 
                             comparison_result, 
                             baseline_landmarks: Dict,
@@ -81,9 +166,11 @@ def draw_comparison_overlay(image: np.ndarray,
         image_height: Height of the image
         
     Returns:
-        Image with overlay drawn
+        Image with overlay drawn, in a per-thread buffer that the next call
+        on the same thread overwrites
     """
-    output = image.copy()
+    output = _get_overlay_buffer(image)
+    np.copyto(output, image)
     
     # Determine color based on accuracy
     if comparison_result.accuracy_level == AccuracyLevel.EXCELLENT:
@@ -96,31 +183,33 @@ def draw_comparison_overlay(image: np.ndarray,
     # Draw baseline pose (dashed lines in blue)
     baseline_color = (255, 200, 0)  # Cyan/light blue for baseline
     
+    # Baseline pixel positions and dashes only change with the baseline or frame size
+    baseline_points, baseline_segments = get_baseline_pixels(
+        baseline_landmarks, image_width, image_height
+    )
+    
+    # Draw baseline points (hollow circles) and dashed lines. Shapes are pinned to
+    # LINE_8; anti-aliasing is several times slower and not needed for markers
+    for point in baseline_points:
+        cv2.circle(output, point, POINT_RADIUS + 2, baseline_color, 2, cv2.LINE_8)
+    
+    if baseline_segments is not None:
+        cv2.polylines(output, baseline_segments, False, baseline_color, 2, cv2.LINE_8)
+    
+    # Current pose segments from both arms are collected into one draw call
+    current_segments = []
+    current_joints = []
+    
+    # Index joint feedback once instead of scanning it for every joint
+    joint_accuracy = {
+        (fb.arm_name, fb.joint_name): fb.is_accurate
+        for fb in comparison_result.joint_feedback
+    }
+    
     for arm_name in ['left_arm', 'right_arm']:
-        baseline_arm = baseline_landmarks.get(arm_name, {})
         current_arm = current_landmarks.get(arm_name, {})
         
-        # Draw baseline joints and lines
-        baseline_points = {}
-        for joint_name in ['shoulder', 'elbow', 'wrist']:
-            if joint_name in baseline_arm:
-                joint = baseline_arm[joint_name]
-                px = int(joint['x'] * image_width)
-                py = int(joint['y'] * image_height)
-                baseline_points[joint_name] = (px, py)
-                
-                # Draw baseline point (hollow circle)
-                cv2.circle(output, (px, py), POINT_RADIUS + 2, baseline_color, 2)
-        
-        # Draw baseline lines (dashed effect using small segments)
-        if 'shoulder' in baseline_points and 'elbow' in baseline_points:
-            draw_dashed_line(output, baseline_points['shoulder'], 
-                           baseline_points['elbow'], baseline_color, 2)
-        if 'elbow' in baseline_points and 'wrist' in baseline_points:
-            draw_dashed_line(output, baseline_points['elbow'], 
-                           baseline_points['wrist'], baseline_color, 2)
-        
-        # Draw current pose with accuracy-based color
+        # Current pose with accuracy-based color
         current_points = {}
         for joint_name in ['shoulder', 'elbow', 'wrist']:
             if joint_name in current_arm:
@@ -129,23 +218,22 @@ def draw_comparison_overlay(image: np.ndarray,
                 py = joint['y']
                 current_points[joint_name] = (px, py)
                 
-                # Check if this joint is accurate
-                joint_accurate = True
-                for fb in comparison_result.joint_feedback:
-                    if fb.joint_name == joint_name and fb.arm_name == arm_name:
-                        joint_accurate = fb.is_accurate
-                        break
-                
+                joint_accurate = joint_accuracy.get((arm_name, joint_name), True)
                 point_color = CORRECT_COLOR if joint_accurate else INCORRECT_COLOR
-                cv2.circle(output, (px, py), POINT_RADIUS, point_color, -1)
+                current_joints.append(((px, py), point_color))
         
-        # Draw current pose lines
+        # Current pose lines
         if 'shoulder' in current_points and 'elbow' in current_points:
-            cv2.line(output, current_points['shoulder'], 
-                    current_points['elbow'], line_color, ARM_LINE_THICKNESS)
+            current_segments.append((current_points['shoulder'], current_points['elbow']))
         if 'elbow' in current_points and 'wrist' in current_points:
-            cv2.line(output, current_points['elbow'], 
-                    current_points['wrist'], line_color, ARM_LINE_THICKNESS)
+            current_segments.append((current_points['elbow'], current_points['wrist']))
+    
+    for point, point_color in current_joints:
+        cv2.circle(output, point, POINT_RADIUS, point_color, -1, cv2.LINE_8)
+    
+    if current_segments:
+        cv2.polylines(output, np.array(current_segments, dtype=np.int32), False,
+                      line_color, ARM_LINE_THICKNESS, cv2.LINE_8)
     
     # Draw accuracy text
     accuracy_text = f"Accuracy: {comparison_result.overall_accuracy:.1f}%"
@@ -159,37 +247,85 @@ def draw_comparison_overlay(image: np.ndarray,
     return output
 
 
-def draw_dashed_line(image: np.ndarray, 
-                     pt1: tuple, 
-                     pt2: tuple, 
-                     color: tuple, 
-                     thickness: int,
-                     dash_length: int = 10):
-    """Draw a dashed line between two points."""
-    dist = np.sqrt((pt2[0] - pt1[0])**2 + (pt2[1] - pt1[1])**2)
-    num_dashes = int(dist / (dash_length * 2))
+def get_baseline_pixels(baseline_landmarks: Dict,
+                        image_width: int,
+                        image_height: int) -> Tuple[List[Tuple[int, int]], Optional[np.ndarray]]:
+    """
+    Get baseline joint pixel positions and dashed line segments for a frame size.
     
-    if num_dashes == 0:
-        cv2.line(image, pt1, pt2, color, thickness)
-        return
+    Results are cached per (width, height) until a different baseline is passed in.
     
-    for i in range(num_dashes):
-        start_ratio = (i * 2 * dash_length) / dist
-        end_ratio = ((i * 2 + 1) * dash_length) / dist
-        
-        if end_ratio > 1:
-            end_ratio = 1
+    Returns:
+        Tuple of (joint points, (N, 2, 2) int32 dash segments or None)
+    """
+    global _baseline_pixel_source
+    
+    # Baselines are replaced wholesale, never mutated, so identity marks a change
+    if baseline_landmarks is not _baseline_pixel_source:
+        _baseline_pixel_cache.clear()
+        _baseline_pixel_source = baseline_landmarks
+    
+    cached = _baseline_pixel_cache.get((image_width, image_height))
+    if cached is not None:
+        return cached
+    
+    points = []
+    segments = []
+    for arm_name in ['left_arm', 'right_arm']:
+        baseline_arm = baseline_landmarks.get(arm_name, {})
         
-        start_pt = (
-            int(pt1[0] + (pt2[0] - pt1[0]) * start_ratio),
-            int(pt1[1] + (pt2[1] - pt1[1]) * start_ratio)
-        )
-        end_pt = (
-            int(pt1[0] + (pt2[0] - pt1[0]) * end_ratio),
-            int(pt1[1] + (pt2[1] - pt1[1]) * end_ratio)
-        )
+        arm_points = {}
+        for joint_name in ['shoulder', 'elbow', 'wrist']:
+            if joint_name in baseline_arm:
+                joint = baseline_arm[joint_name]
+                arm_points[joint_name] = (
+                    int(joint['x'] * image_width),
+                    int(joint['y'] * image_height)
+                )
+                points.append(arm_points[joint_name])
         
-        cv2.line(image, start_pt, end_pt, color, thickness)
+        if 'shoulder' in arm_points and 'elbow' in arm_points:
+            segments.append(dashed_line_segments(arm_points['shoulder'], arm_points['elbow']))
+        if 'elbow' in arm_points and 'wrist' in arm_points:
+            segments.append(dashed_line_segments(arm_points['elbow'], arm_points['wrist']))
+    
+    cached = (points, np.concatenate(segments) if segments else None)
+    _baseline_pixel_cache[(image_width, image_height)] = cached
+    return cached
+
+
+def dashed_line_segments(pt1: tuple, pt2: tuple, dash_length: int = 10) -> np.ndarray:
+    """
+    Compute the dash segments of a dashed line between two points.
+    
+    Returns:
+        (N, 2, 2) int32 array of dash start and end points, suitable for
+        cv2.polylines. Lines too short to dash come back as one segment.
+    """
+    dist = math.hypot(pt2[0] - pt1[0], pt2[1] - pt1[1])
+    num_dashes = int(dist / (dash_length * 2))
+    
+    if num_dashes == 0:
+        return np.array([[pt1, pt2]], dtype=np.int32)
+    
+    # Compute every dash endpoint at once
+    dash_index = np.arange(num_dashes)
+    start_ratios = (dash_index * 2 * dash_length) / dist
+    end_ratios = np.minimum(((dash_index * 2 + 1) * dash_length) / dist, 1)
+    
+    start = np.array(pt1, dtype=np.float64)
+    delta = np.array(pt2, dtype=np.float64) - start
+    segments = np.empty((num_dashes, 2, 2), dtype=np.int32)
+    segments[:, 0] = start + delta * start_ratios[:, None]
+    segments[:, 1] = start + delta * end_ratios[:, None]
+    
+    return segments
+
+
+# Load the default baseline and warm up the pose model at import, so WSGI
+# workers serve their first request warm rather than only when run as __main__
+get_comparator()
+warmup(detect_hands=False)
 
 
 # ============== Flask Endpoints ==============
@@ -236,10 +372,13 @@ def collect_baseline():
             aggregate_method
         )
         
-        # Reload the comparator with new baseline
-        _comparator = PoseComparator(baseline_path=output_path)
-        _comparator.load_baseline()
-        _baseline_loaded = True
+        # Reload the comparator with new baseline, swapping it in only once loaded
+        comparator = PoseComparator(baseline_path=output_path)
+        comparator.load_baseline()
+        with _comparator_lock:
+            _comparator = comparator
+            _baseline_loaded = True
+        clear_frame_cache()
         
         return jsonify({
             'success': True,
@@ -274,6 +413,7 @@ def set_baseline():
             if 'baseline_file' in data:
                 comparator.load_baseline(data['baseline_file'])
                 _baseline_loaded = True
+                clear_frame_cache()
                 return jsonify({
                     'success': True,
                     'message': f"Baseline loaded from {data['baseline_file']}"
@@ -283,7 +423,7 @@ def set_baseline():
             if 'image' in data:
                 image = decode_base64_image(data['image'])
                 collector = BaselineCollector(None)
-                result = process_image_landmarks(image)
+                result = process_image_landmarks(image, detect_hands=False)
                 
                 if not result.get('pose_detected'):
                     return jsonify({'error': 'No pose detected in image'}), 400
@@ -300,6 +440,7 @@ def set_baseline():
                 
                 comparator.set_baseline(baseline_data)
                 _baseline_loaded = True
+                clear_frame_cache()
                 
                 return jsonify({
                     'success': True,
@@ -309,12 +450,10 @@ def set_baseline():
         
         # Handle file upload
         if 'image' in request.files:
-            file = request.files['image']
-            file_bytes = np.frombuffer(file.read(), np.uint8)
-            image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+            image = decode_uploaded_image(request.files['image'])
             
             collector = BaselineCollector(None)
-            result = process_image_landmarks(image)
+            result = process_image_landmarks(image, detect_hands=False)
             
             if not result.get('pose_detected'):
                 return jsonify({'error': 'No pose detected in image'}), 400
@@ -331,6 +470,7 @@ def set_baseline():
             
             comparator.set_baseline(baseline_data)
             _baseline_loaded = True
+            clear_frame_cache()
             
             return jsonify({
                 'success': True,
@@ -370,12 +510,10 @@ def compare_pose():
             data = request.get_json()
             if 'image' not in data:
                 return jsonify({'error': 'No image provided'}), 400
-            image = decode_base64_image(data['image'])
+            image = decode_base64_image(data['image'], rgb=True)
         
         elif 'image' in request.files:
-            file = request.files['image']
-            file_bytes = np.frombuffer(file.read(), np.uint8)
-            image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+            image = decode_uploaded_image(request.files['image'], rgb=True)
         
         else:
             return jsonify({'error': 'No image provided'}), 400
@@ -383,11 +521,20 @@ def compare_pose():
         if image is None:
             return jsonify({'error': 'Failed to decode image'}), 400
         
+        # Repeated frames reuse the previous response; the comparator
+        # reuses the same digest so the frame is only hashed once
+        digest = image_digest(image)
+        key = _frame_key('compare-pose', image, digest=digest)
+        response_data = _get_cached_frame(key)
+        if response_data is not None:
+            return jsonify(response_data)
+        
         # Compare pose
-        result = comparator.compare_image(image)
+        # Inference-only path: the image was decoded straight to RGB
+        result = comparator.compare_image(image, rgb=True, digest=digest)
         flag = comparator.get_comparison_flag(result)
         
-        return jsonify({
+        response_data = {
             'success': True,
             'flag': flag,
             'detailed_feedback': {
@@ -403,12 +550,87 @@ def compare_pose():
                 ],
                 'angle_feedback': result.angle_feedback
             }
-        })
+        }
+        _cache_frame(key, response_data)
+        
+        return jsonify(response_data)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def _compare_pose_visual_request():
+    """
+    Decode the request image, compare it to the baseline and draw the overlay.
+    
+    Returns:
+        (jpeg_bytes, flag, None) on success, or (None, None, error_response)
+    """
+    comparator = get_comparator()
+    
+    if not _baseline_loaded:
+        return None, None, (jsonify({
+            'error': 'No baseline loaded. Call /collect-baseline or /set-baseline first'
+        }), 400)
+    
+    image = None
+    
+    if request.is_json:
+        data = request.get_json()
+        if 'image' not in data:
+            return None, None, (jsonify({'error': 'No image provided'}), 400)
+        image = decode_base64_image(data['image'])
+    
+    elif 'image' in request.files:
+        image = decode_uploaded_image(request.files['image'])
+    
+    else:
+        return None, None, (jsonify({'error': 'No image provided'}), 400)
+    
+    if image is None:
+        return None, None, (jsonify({'error': 'Failed to decode image'}), 400)
+    
+    # Repeated frames reuse the previous overlay; quality changes the encoded bytes
+    params = _jpeg_params()
+    key = _frame_key('compare-pose-visual', image, params[1])
+    cached = _get_cached_frame(key)
+    if cached is not None:
+        jpeg_bytes, flag = cached
+        return jpeg_bytes, flag, None
+    
+    h, w = image.shape[:2]
+    
+    # Get current landmarks; the overlay and comparison never use forefingers
+    landmark_result = process_image_landmarks(image, detect_hands=False)
+    
+    if not landmark_result.get('pose_detected'):
+        return None, None, (jsonify({'error': 'No pose detected in image'}), 400)
+    
+    # Compare pose
+    result = comparator.compare_pose(landmark_result['landmarks'], w, h)
+    flag = comparator.get_comparison_flag(result)
+    
+    # Draw comparison overlay
+    baseline_landmarks = comparator.baseline_data['baseline_landmarks']
+    output_image = draw_comparison_overlay(
+        image, result, baseline_landmarks, 
+        landmark_result['landmarks'], w, h
+    )
+    
+    # Encode as JPEG, which is much cheaper than PNG for camera frames
+    _, buffer = cv2.imencode('.jpg', output_image, params)
+    jpeg_bytes = buffer.tobytes()
+    _cache_frame(key, (jpeg_bytes, flag))
+    
+    return jpeg_bytes, flag, None
+
+
+def _jpeg_params() -> list:
+    """JPEG encoder params, honouring an optional ?quality= query parameter."""
+    quality = min(max(request.args.get('quality', JPEG_QUALITY, type=int), 1), 100)
+    return [cv2.IMWRITE_JPEG_QUALITY, quality]
+
+
 @app.route('/compare-pose-visual', methods=['POST'])
 def compare_pose_visual():
     """
@@ -417,62 +639,21 @@ def compare_pose_visual():
     Accepts:
         - JSON with base64 image: {"image": "base64_string"}
         - Form data with image file
+        - Optional query param quality: JPEG quality 1-100 (default 80)
     
     Returns:
-        JSON with processed image and accuracy data
+        JSON with processed image (JPEG data URL) and accuracy data
     """
     try:
-        comparator = get_comparator()
-        
-        if not _baseline_loaded:
-            return jsonify({
-                'error': 'No baseline loaded. Call /collect-baseline or /set-baseline first'
-            }), 400
+        jpeg_bytes, flag, error = _compare_pose_visual_request()
+        if error:
+            return error
         
-        image = None
-        
-        if request.is_json:
-            data = request.get_json()
-            if 'image' not in data:
-                return jsonify({'error': 'No image provided'}), 400
-            image = decode_base64_image(data['image'])
-        
-        elif 'image' in request.files:
-            file = request.files['image']
-            file_bytes = np.frombuffer(file.read(), np.uint8)
-            image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
-        
-        else:
-            return jsonify({'error': 'No image provided'}), 400
-        
-        if image is None:
-            return jsonify({'error': 'Failed to decode image'}), 400
-        
-        h, w = image.shape[:2]
-        
-        # Get current landmarks
-        landmark_result = process_image_landmarks(image)
-        
-        if not landmark_result.get('pose_detected'):
-            return jsonify({'error': 'No pose detected in image'}), 400
-        
-        # Compare pose
-        result = comparator.compare_pose(landmark_result['landmarks'], w, h)
-        flag = comparator.get_comparison_flag(result)
-        
-        # Draw comparison overlay
-        baseline_landmarks = comparator.baseline_data['baseline_landmarks']
-        output_image = draw_comparison_overlay(
-            image, result, baseline_landmarks, 
-            landmark_result['landmarks'], w, h
-        )
-        
-        # Encode output image
-        processed_base64 = encode_image_to_base64(output_image)
+        processed_base64 = base64.b64encode(jpeg_bytes).decode('utf-8')
         
         return jsonify({
             'success': True,
-            'processed_image': f'data:image/png;base64,{processed_base64}',
+            'processed_image': f'data:image/jpeg;base64,{processed_base64}',
             'flag': flag
         })
     
@@ -480,6 +661,31 @@ def compare_pose_visual():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/compare-pose-visual-raw', methods=['POST'])
+def compare_pose_visual_raw():
+    """
+    Compare pose and return the overlay image directly as JPEG bytes.
+    
+    Accepts the same input as /compare-pose-visual. Skips base64 entirely;
+    the accuracy flag is sent as JSON in the X-Accuracy-Flag header.
+    """
+    try:
+        jpeg_bytes, flag, error = _compare_pose_visual_request()
+        if error:
+            return error
+        
+        response = send_file(
+            BytesIO(jpeg_bytes),
+            mimetype='image/jpeg',
+            as_attachment=False
+        )
+        response.headers['X-Accuracy-Flag'] = json.dumps(flag)
+        return response
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/get-baseline', methods=['GET'])
 def get_baseline():
     """Get the current baseline data."""
@@ -524,6 +730,7 @@ def configure():
             comparator.angle_threshold = float(data['angle_threshold'])
         if 'accuracy_threshold' in data:
             comparator.accuracy_threshold = float(data['accuracy_threshold'])
+        clear_frame_cache()
         
         return jsonify({
             'success': True,
@@ -563,21 +770,26 @@ def get_pose_score():
             data = request.get_json() 
             if 'image' not in data:
                 return jsonify({'score': 0, 'error': 'No image provided'}), 400
-            image = decode_base64_image(data['image'])
+            image = decode_base64_image(data['image'], rgb=True)
         elif 'image' in request.files:
-            file = request.files['image']
-            file_bytes = np.frombuffer(file.read(), np.uint8)
-            image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+            image = decode_uploaded_image(request.files['image'], rgb=True)
         else:
             return jsonify({'score': 0, 'error': 'No image provided'}), 400
 
         if image is None:
             return jsonify({'score': 0, 'error': 'Failed to decode image'}), 400
         
-        # Compare pose and return the score 
-        result = comparator.compare_image(image)
+        # Repeated frames reuse the previous score
+        digest = image_digest(image)
+        key = _frame_key('score', image, digest=digest)
+        score = _get_cached_frame(key)
+        if score is None:
+            # Compare pose and return the score 
+            result = comparator.compare_image(image, rgb=True, digest=digest)
+            score = round(float(result.overall_accuracy),2)
+            _cache_frame(key, score)
         return jsonify({
-            'score': round(float(result.overall_accuracy),2)
+            'score': score
         })
     except Exception as e:
         return jsonify({'score': 0, 'error': str(e)}), 500
@@ -617,16 +829,17 @@ def get_pose_score_detailed(landmarks, image_width, image_height):
     
     # Build joint feedback dictionary
     # Format: {arm}_{joint} -> {is_accurate, deviation, message}
-    joints_feedback = {}
-    for fb in result.joint_feedback:
-        key = f"{fb.arm_name}_{fb.joint_name}"
-        joints_feedback[key] = {
-            'is_accurate': bool(fb.is_accurate),
-            'deviation': round(float(fb.deviation), 4),
+    # compare_pose already yields plain bools and floats, so no per-value casts
+    joints_feedback = {
+        f"{fb.arm_name}_{fb.joint_name}": {
+            'is_accurate': fb.is_accurate,
+            'deviation': round(fb.deviation, 4),
             'message': fb.message,
             'arm': fb.arm_name,
             'joint': fb.joint_name
         }
+        for fb in result.joint_feedback
+    }
     if not joints_feedback: # joints not
         errMsg += "Joint feedback failed!\n"
     
@@ -646,14 +859,12 @@ if __name__ == '__main__':
     print("  POST /score               - Get just the accuracy percentage (quick score)")
     print("  POST /compare-pose        - Compare pose and get accuracy flag")
     print("  POST /compare-pose-visual - Compare pose with visual overlay")
+    print("  POST /compare-pose-visual-raw - Visual overlay as raw JPEG bytes")
     print("  POST /configure           - Configure comparison thresholds")
     
-    # Try to load default baseline on startup
-    if os.path.exists(DEFAULT_BASELINE_FILE):
-        try:
-            get_comparator().load_baseline()
-            print(f"\nDefault baseline loaded from: {DEFAULT_BASELINE_FILE}")
-        except Exception as e:
-            print(f"\nNote: Could not load default baseline: {e}")
-    
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    # The development server is only for debugging; serve with waitress otherwise.
+    # For multiple processes: gunicorn -k gthread -w 2 --threads 8 -b 0.0.0.0:5002 correctForm:app
+    if serve is not None and not debug:
+        serve(app, host='0.0.0.0', port=port, threads=8)
+    else:
+        app.run(host='0.0.0.0', port=port, debug=debug)
@@ -5,6 +5,9 @@ Draws lines: shoulder -> elbow -> wrist -> forefinger
 """
 
 import time
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
 import cv2
@@ -14,25 +17,47 @@ from mediapipe.tasks.python import vision
 import numpy as np
 import base64
 from io import BytesIO
-from PIL import Image
 import os
+import threading
 import urllib.request
 
+try:
+    from waitress import serve
+except ImportError:  # Optional; falls back to the Flask development server
+    serve = None
+
 app = Flask(__name__)
 CORS(app)
 
+logger = logging.getLogger(__name__)
+
 # Custom drawing specs for arm lines
 ARM_LINE_COLOR = (0, 255, 0)  # Green in BGR
 ARM_LINE_THICKNESS = 3
 POINT_COLOR = (0, 0, 255)  # Red in BGR
 POINT_RADIUS = 5
 
-# Model paths
-POSE_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'pose_landmarker.task')
+# Pose model variant from POSE_MODEL: lite (fastest), full or heavy (most accurate)
+POSE_MODEL = os.environ.get('POSE_MODEL', 'lite').lower()
+POSE_MODEL_URLS = {
+    variant: f"https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_{variant}/float16/1/pose_landmarker_{variant}.task"
+    for variant in ('lite', 'full', 'heavy')
+}
+if POSE_MODEL not in POSE_MODEL_URLS:
+    raise ValueError(f"POSE_MODEL must be one of {', '.join(POSE_MODEL_URLS)}, got {POSE_MODEL!r}")
+
+# Lower values find more poses in hard frames; higher values skip doubtful ones
+POSE_MIN_DETECTION_CONFIDENCE = float(os.environ.get('POSE_MIN_DETECTION_CONFIDENCE', 0.5))
+
+# Model paths (the bundled pose_landmarker.task is the lite model)
+POSE_MODEL_PATH = os.path.join(
+    os.path.dirname(__file__),
+    'pose_landmarker.task' if POSE_MODEL == 'lite' else f'pose_landmarker_{POSE_MODEL}.task'
+)
 HAND_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'hand_landmarker.task')
 
 # Model URLs
-POSE_MODEL_URL = "https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_heavy/float16/1/pose_landmarker_heavy.task"
+POSE_MODEL_URL = POSE_MODEL_URLS[POSE_MODEL]
 HAND_MODEL_URL = "https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/1/hand_landmarker.task"
 
 
@@ -48,39 +73,159 @@ def download_model(url, path):
 download_model(POSE_MODEL_URL, POSE_MODEL_PATH)
 download_model(HAND_MODEL_URL, HAND_MODEL_PATH)
 
+# Save a copy of each processed image to output/ when SAVE_OUTPUTS=true (debugging aid)
+SAVE_OUTPUTS = os.environ.get('SAVE_OUTPUTS', 'False').lower() == 'true'
+OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'output')
+
+# Writes saved outputs off the request thread
+_disk_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='disk')
+
+if SAVE_OUTPUTS:
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+# Run inference on the TFLite GPU delegate when USE_GPU_POSE=true (falls back to CPU)
+USE_GPU_POSE = os.environ.get('USE_GPU_POSE', 'False').lower() == 'true'
+
+# MediaPipe delegate from MP_DELEGATE: cpu, gpu, or auto (GPU, falling back to CPU).
+# USE_GPU_POSE=true is the older spelling of auto.
+MP_DELEGATE = os.environ.get('MP_DELEGATE', 'auto' if USE_GPU_POSE else 'cpu').lower()
+if MP_DELEGATE not in ('cpu', 'gpu', 'auto'):
+    raise ValueError(f"MP_DELEGATE must be one of cpu, gpu, auto, got {MP_DELEGATE!r}")
+
 # Cache landmarker instances globally to avoid reloading models on each request
 _pose_landmarker = None
 _hand_landmarker = None
 
+# Runs hand detection alongside pose detection; MediaPipe releases the GIL while detecting
+_hand_detect_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='hand-detect')
+
+# Per-thread RGB conversion buffer reused by bgr_to_rgb
+_rgb_buffers = threading.local()
+
+# Video-mode landmarkers for streamed frames (track=1), which track landmarks between
+# consecutive frames instead of re-running the full detector on each one
+_stream_landmarkers = None
+_stream_lock = threading.Lock()
+_stream_timestamp_ms = 0
+
+
+def create_landmarker(landmarker_class, options_class, model_path, **options):
+    """
+    Create a landmarker on the delegate selected by MP_DELEGATE.
+    
+    With auto, falls back to the CPU delegate if the GPU delegate is unavailable.
+    """
+    delegates = {
+        'cpu': [python.BaseOptions.Delegate.CPU],
+        'gpu': [python.BaseOptions.Delegate.GPU],
+        'auto': [python.BaseOptions.Delegate.GPU, python.BaseOptions.Delegate.CPU]
+    }[MP_DELEGATE]
+    
+    for delegate in delegates:
+        try:
+            return landmarker_class.create_from_options(options_class(
+                base_options=python.BaseOptions(model_asset_path=model_path, delegate=delegate),
+                **options
+            ))
+        except RuntimeError as e:
+            if delegate == delegates[-1]:
+                raise
+            print(f"Warning: GPU delegate unavailable, using CPU: {e}")
+
+
 def get_pose_landmarker():
     """Get or create cached pose landmarker instance."""
     global _pose_landmarker
     if _pose_landmarker is None:
-        pose_options = vision.PoseLandmarkerOptions(
-            base_options=python.BaseOptions(model_asset_path=POSE_MODEL_PATH),
+        _pose_landmarker = create_landmarker(
+            vision.PoseLandmarker, vision.PoseLandmarkerOptions, POSE_MODEL_PATH,
             running_mode=vision.RunningMode.IMAGE,
             num_poses=1,
-            min_pose_detection_confidence=0.5,
+            min_pose_detection_confidence=POSE_MIN_DETECTION_CONFIDENCE,
             min_pose_presence_confidence=0.5,
             min_tracking_confidence=0.5
         )
-        _pose_landmarker = vision.PoseLandmarker.create_from_options(pose_options)
     return _pose_landmarker
 
 def get_hand_landmarker():
     """Get or create cached hand landmarker instance."""
     global _hand_landmarker
     if _hand_landmarker is None:
-        hand_options = vision.HandLandmarkerOptions(
-            base_options=python.BaseOptions(model_asset_path=HAND_MODEL_PATH),
+        _hand_landmarker = create_landmarker(
+            vision.HandLandmarker, vision.HandLandmarkerOptions, HAND_MODEL_PATH,
             running_mode=vision.RunningMode.IMAGE,
             num_hands=2,
             min_hand_detection_confidence=0.5,
             min_hand_presence_confidence=0.5,
             min_tracking_confidence=0.5
         )
-        _hand_landmarker = vision.HandLandmarker.create_from_options(hand_options)
     return _hand_landmarker
+
+
+def get_stream_landmarkers():
+    """Get or create the cached (pose, hand) landmarkers for streamed frames."""
+    global _stream_landmarkers
+    if _stream_landmarkers is None:
+        with _stream_lock:
+            if _stream_landmarkers is None:
+                _stream_landmarkers = (
+                    create_landmarker(
+                        vision.PoseLandmarker, vision.PoseLandmarkerOptions, POSE_MODEL_PATH,
+                        running_mode=vision.RunningMode.VIDEO,
+                        num_poses=1,
+                        min_pose_detection_confidence=POSE_MIN_DETECTION_CONFIDENCE,
+                        min_pose_presence_confidence=0.5,
+                        min_tracking_confidence=0.5
+                    ),
+                    create_landmarker(
+                        vision.HandLandmarker, vision.HandLandmarkerOptions, HAND_MODEL_PATH,
+                        running_mode=vision.RunningMode.VIDEO,
+                        num_hands=2,
+                        min_hand_detection_confidence=0.5,
+                        min_hand_presence_confidence=0.5,
+                        min_tracking_confidence=0.5
+                    )
+                )
+    return _stream_landmarkers
+
+
+def detect_stream_frame(mp_image):
+    """
+    Detect pose and hands on the next frame of a live camera stream.
+    
+    Frames are processed one at a time so each is tracked from the previous one.
+    
+    Returns:
+        (pose_results, hand_results)
+    """
+    global _stream_timestamp_ms
+    pose_landmarker, hand_landmarker = get_stream_landmarkers()
+    
+    with _stream_lock:
+        # Video mode needs strictly increasing timestamps
+        _stream_timestamp_ms = max(_stream_timestamp_ms + 1, int(time.monotonic() * 1000))
+        
+        hand_future = _hand_detect_pool.submit(
+            hand_landmarker.detect_for_video, mp_image, _stream_timestamp_ms
+        )
+        pose_results = pose_landmarker.detect_for_video(mp_image, _stream_timestamp_ms)
+        return pose_results, hand_future.result()
+
+
+def warmup(detect_hands=True):
+    """
+    Run one dummy detection per cached landmarker so the first request does
+    not pay for graph initialization and tensor allocation.
+    
+    Args:
+        detect_hands: Also warm up the hand landmarker
+    """
+    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.zeros((256, 256, 3), np.uint8))
+    get_pose_landmarker().detect(mp_image)
+    if detect_hands:
+        get_hand_landmarker().detect(mp_image)
+
+
 class PoseLandmark:
     LEFT_SHOULDER = 11
     LEFT_ELBOW = 13
@@ -95,20 +240,87 @@ class HandLandmark:
     INDEX_FINGER_TIP = 8
 
 
-def decode_base64_image(base64_string):
+# Decodes straight to RGB (OpenCV 4.10+); older versions convert after decoding
+IMREAD_COLOR_RGB = getattr(cv2, 'IMREAD_COLOR_RGB', None)
+
+
+# Longer side frames are shrunk to before detection, from MAX_DETECTION_SIZE
+# (see downscale_for_detection); 0 keeps the full resolution
+MAX_DETECTION_SIZE = int(os.environ.get('MAX_DETECTION_SIZE', 0))
+
+
+# Landmarks count as visible when their visibility/presence score is above this
+VISIBILITY_THRESHOLD = 0.5
+
+
+# Pose landmark indices per arm (left, right), ordered shoulder, elbow, wrist
+ARM_LANDMARK_INDICES = (
+    (PoseLandmark.LEFT_SHOULDER, PoseLandmark.LEFT_ELBOW, PoseLandmark.LEFT_WRIST),
+    (PoseLandmark.RIGHT_SHOULDER, PoseLandmark.RIGHT_ELBOW, PoseLandmark.RIGHT_WRIST)
+)
+
+
+def decode_base64_image(base64_string, rgb=False):
     """Decode a base64 image string to a numpy array."""
     # Remove data URL prefix if present
     if ',' in base64_string:
         base64_string = base64_string.split(',')[1]
     
-    image_data = base64.b64decode(base64_string)
-    image = Image.open(BytesIO(image_data))
-    return cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    return decode_image_bytes(base64.b64decode(base64_string), rgb)
+
 
+def decode_uploaded_image(file, rgb=False):
+    """Decode an uploaded image file straight from its request stream."""
+    # Small uploads are held in memory; decode from the stream's own buffer
+    # rather than copying it out with read()
+    getbuffer = getattr(file.stream, 'getbuffer', None)
+    if getbuffer is not None:
+        return decode_image_bytes(getbuffer(), rgb)
+    return decode_image_bytes(file.stream.read(), rgb)
 
-def encode_image_to_base64(image):
+
+def decode_image_bytes(image_data, rgb=False):
+    """
+    Decode encoded image bytes to a numpy array, or None if undecodable.
+    
+    Args:
+        image_data: Encoded image bytes
+        rgb: Return RGB instead of BGR, for inference-only callers that never
+            draw with OpenCV
+    """
+    # np.frombuffer wraps the bytes without copying them
+    buffer = np.frombuffer(image_data, np.uint8)
+    
+    if not rgb:
+        return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+    if IMREAD_COLOR_RGB is not None:
+        return cv2.imdecode(buffer, IMREAD_COLOR_RGB)
+    
+    image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+    return None if image is None else cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def bgr_to_rgb(image):
+    """
+    Convert a BGR image to RGB in this thread's reusable buffer.
+    
+    The result is overwritten by the next call on the same thread, so it must
+    only be used for detection (mp.Image copies its input).
+    """
+    buffer = getattr(_rgb_buffers, 'rgb', None)
+    if buffer is None or buffer.size < image.size:
+        # Grow only when a larger frame arrives; smaller frames reuse a prefix
+        buffer = np.empty(image.size, dtype=np.uint8)
+        _rgb_buffers.rgb = buffer
+    
+    image_rgb = buffer[:image.size].reshape(image.shape)
+    cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image_rgb)
+    return image_rgb
+
+
+def encode_image_to_base64(image, ext='.png', params=()):
     """Encode a numpy array image to base64 string."""
-    _, buffer = cv2.imencode('.png', image)
+    _, buffer = cv2.imencode(ext, image, list(params))
     return base64.b64encode(buffer).decode('utf-8')
 
 
@@ -120,6 +332,72 @@ def get_landmark_pixel_coords(landmark, image_width, image_height):
     )
 
 
+def landmarks_to_px(landmarks, image_width, image_height):
+    """
+    Convert a list of normalized landmarks to pixel coordinates in one pass.
+    
+    Returns:
+        (N, 2) int32 array of pixel x, y, truncated like get_landmark_pixel_coords
+    """
+    # reshape keeps an empty list as a (0, 2) array so the scaling still broadcasts
+    coords = np.array([(landmark.x, landmark.y) for landmark in landmarks], dtype=np.float64).reshape(-1, 2)
+    coords *= (image_width, image_height)
+    return coords.astype(np.int32)
+
+
+def landmarks_visibility(landmarks):
+    """Visibility (or presence) score of each landmark as a float32 array."""
+    return np.array(
+        [getattr(landmark, 'visibility', getattr(landmark, 'presence', 1.0)) for landmark in landmarks],
+        dtype=np.float32
+    )
+
+
+def hands_to_px(hand_landmarks_list, image_width, image_height):
+    """
+    Pixel coordinates of the wrist and index finger tip of each detected hand.
+    
+    Returns:
+        List of ((wrist_x, wrist_y), (tip_x, tip_y)) tuples, one per hand
+    """
+    coords = landmarks_to_px(
+        [hand_landmarks[index]
+         for hand_landmarks in hand_landmarks_list
+         for index in (HandLandmark.WRIST, HandLandmark.INDEX_FINGER_TIP)],
+        image_width, image_height
+    ).tolist()
+    return [(tuple(coords[i]), tuple(coords[i + 1])) for i in range(0, len(coords), 2)]
+
+
+def match_hand(wrist_px, hands_px, image_width, image_height):
+    """
+    Index of the hand whose wrist is closest to a pose wrist.
+    
+    Args:
+        wrist_px: Pixel coordinates of the wrist from pose detection
+        hands_px: Hand pixel coordinates from hands_to_px
+    
+    Returns:
+        Index into hands_px, or -1 if no hand wrist is within 10% of the
+        image diagonal
+    """
+    best_index = -1
+    
+    # Compared as squared distances so no square roots are needed
+    min_distance_sq = 0.01 * (image_width * image_width + image_height * image_height)
+    
+    for index, (hand_wrist_px, _) in enumerate(hands_px):
+        dx = wrist_px[0] - hand_wrist_px[0]
+        dy = wrist_px[1] - hand_wrist_px[1]
+        distance_sq = dx * dx + dy * dy
+        
+        if distance_sq < min_distance_sq:
+            min_distance_sq = distance_sq
+            best_index = index
+    
+    return best_index
+
+
 def draw_arm_lines(image, pose_landmarks, hand_landmarks_list, image_width, image_height):
     """
     Draw lines from shoulder to elbow to wrist to forefinger on both arms.
@@ -141,74 +419,50 @@ def draw_arm_lines(image, pose_landmarks, hand_landmarks_list, image_width, imag
         return image, arms_detected
     
     landmarks = pose_landmarks
+    landmarks_px = landmarks_to_px(landmarks, image_width, image_height).tolist()
+    hands_px = hands_to_px(hand_landmarks_list, image_width, image_height)
     
-    # Define arm landmark indices for MediaPipe Pose
-    # Left arm: shoulder(11), elbow(13), wrist(15)
-    # Right arm: shoulder(12), elbow(14), wrist(16)
-    arm_configs = [
-        {
-            'name': 'left',
-            'shoulder': PoseLandmark.LEFT_SHOULDER,
-            'elbow': PoseLandmark.LEFT_ELBOW,
-            'wrist': PoseLandmark.LEFT_WRIST,
-        },
-        {
-            'name': 'right',
-            'shoulder': PoseLandmark.RIGHT_SHOULDER,
-            'elbow': PoseLandmark.RIGHT_ELBOW,
-            'wrist': PoseLandmark.RIGHT_WRIST,
-        }
-    ]
+    # Whether shoulder, elbow and wrist are all visible enough, per arm (left, right)
+    arms_visible = (
+        landmarks_visibility(landmarks)[np.array(ARM_LANDMARK_INDICES)] > VISIBILITY_THRESHOLD
+    ).all(axis=1).tolist()
     
-    for arm in arm_configs:
-        shoulder = landmarks[arm['shoulder']]
-        elbow = landmarks[arm['elbow']]
-        wrist = landmarks[arm['wrist']]
-        
-        # Check visibility/presence threshold (landmarks are visible enough)
-        visibility_threshold = 0.5
-        shoulder_vis = getattr(shoulder, 'visibility', getattr(shoulder, 'presence', 1.0))
-        elbow_vis = getattr(elbow, 'visibility', getattr(elbow, 'presence', 1.0))
-        wrist_vis = getattr(wrist, 'visibility', getattr(wrist, 'presence', 1.0))
-        
-        if (shoulder_vis > visibility_threshold and 
-            elbow_vis > visibility_threshold and 
-            wrist_vis > visibility_threshold):
-            
+    arm_chains = []
+    
+    for arm_side, (shoulder, elbow, wrist), arm_visible in zip(
+            ('left', 'right'), ARM_LANDMARK_INDICES, arms_visible):
+        if arm_visible:
             arms_detected = True
             
             # Get pixel coordinates
-            shoulder_px = get_landmark_pixel_coords(shoulder, image_width, image_height)
-            elbow_px = get_landmark_pixel_coords(elbow, image_width, image_height)
-            wrist_px = get_landmark_pixel_coords(wrist, image_width, image_height)
+            shoulder_px = landmarks_px[shoulder]
+            elbow_px = landmarks_px[elbow]
+            wrist_px = tuple(landmarks_px[wrist])
             
-            # Draw shoulder to elbow line
-            cv2.line(image, shoulder_px, elbow_px, ARM_LINE_COLOR, ARM_LINE_THICKNESS)
-            
-            # Draw elbow to wrist line
-            cv2.line(image, elbow_px, wrist_px, ARM_LINE_COLOR, ARM_LINE_THICKNESS)
-            
-            # Draw points at joints
-            cv2.circle(image, shoulder_px, POINT_RADIUS, POINT_COLOR, -1)
-            cv2.circle(image, elbow_px, POINT_RADIUS, POINT_COLOR, -1)
-            cv2.circle(image, wrist_px, POINT_RADIUS, POINT_COLOR, -1)
-            
-            # Try to find the corresponding hand and draw line to forefinger
+            # Try to find the corresponding hand to extend the arm to the forefinger
             forefinger_px = find_forefinger_for_wrist(
-                wrist_px, hand_landmarks_list, image_width, image_height, arm['name']
+                wrist_px, hand_landmarks_list, image_width, image_height, arm_side, hands_px
             )
             
+            # Shoulder -> elbow -> wrist (-> forefinger) chain
+            chain = [shoulder_px, elbow_px, wrist_px]
             if forefinger_px:
-                # Draw wrist to forefinger line
-                cv2.line(image, wrist_px, forefinger_px, ARM_LINE_COLOR, ARM_LINE_THICKNESS)
-                cv2.circle(image, forefinger_px, POINT_RADIUS, POINT_COLOR, -1)
+                chain.append(forefinger_px)
+            arm_chains.append(np.array(chain, dtype=np.int32))
+    
+    if arm_chains:
+        # Draw all arm lines in one call, then the joint points on top of them
+        cv2.polylines(image, arm_chains, False, ARM_LINE_COLOR, ARM_LINE_THICKNESS)
+        for point in np.concatenate(arm_chains).tolist():
+            cv2.circle(image, point, POINT_RADIUS, POINT_COLOR, -1)
     
     return image, arms_detected
 
 
 
 
-def find_forefinger_for_wrist(wrist_px, hand_landmarks_list, image_width, image_height, arm_side):
+def find_forefinger_for_wrist(wrist_px, hand_landmarks_list, image_width, image_height, arm_side,
+                              hands_px=None):
     """
     Find the forefinger tip that corresponds to the given wrist position.
     
@@ -218,6 +472,7 @@ def find_forefinger_for_wrist(wrist_px, hand_landmarks_list, image_width, image_
         image_width: Width of the image
         image_height: Height of the image
         arm_side: 'left' or 'right' to help match the correct hand
+        hands_px: hands_to_px result, when the caller already computed it
     
     Returns:
         Pixel coordinates of the forefinger tip, or None if not found
@@ -225,83 +480,86 @@ def find_forefinger_for_wrist(wrist_px, hand_landmarks_list, image_width, image_
     if not hand_landmarks_list:
         return None
     
-    best_hand = None
-    min_distance = float('inf')
+    if hands_px is None:
+        hands_px = hands_to_px(hand_landmarks_list, image_width, image_height)
     
-    for hand_landmarks in hand_landmarks_list:
-        # Get wrist position from hand landmarks (landmark 0 is wrist)
-        hand_wrist = hand_landmarks[HandLandmark.WRIST]
-        hand_wrist_px = get_landmark_pixel_coords(hand_wrist, image_width, image_height)
-        
-        # Calculate distance between pose wrist and hand wrist
-        distance = np.sqrt(
-            (wrist_px[0] - hand_wrist_px[0])**2 + 
-            (wrist_px[1] - hand_wrist_px[1])**2
-        )
-        
-        # Use a threshold based on image size (10% of image diagonal)
-        threshold = 0.1 * np.sqrt(image_width**2 + image_height**2)
-        
-        if distance < threshold and distance < min_distance:
-            min_distance = distance
-            best_hand = hand_landmarks
+    # Match on the hand wrist (landmark 0), return its forefinger tip (landmark 8)
+    index = match_hand(wrist_px, hands_px, image_width, image_height)
+    return hands_px[index][1] if index >= 0 else None
+
+
+def downscale_for_detection(image):
+    """
+    Shrink an image so its longer side is at most MAX_DETECTION_SIZE.
     
-    if best_hand:
-        # Get forefinger tip (INDEX_FINGER_TIP is landmark 8)
-        forefinger = best_hand[HandLandmark.INDEX_FINGER_TIP]
-        return get_landmark_pixel_coords(forefinger, image_width, image_height)
+    The models run on much smaller inputs internally, and landmarks are
+    normalized, so pixel coordinates are still computed against the original
+    image size.
+    """
+    if not MAX_DETECTION_SIZE:
+        return image
     
-    return None
+    image_height, image_width = image.shape[:2]
+    scale = MAX_DETECTION_SIZE / max(image_height, image_width)
+    if scale >= 1:
+        return image
+    return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
 
 
-def process_image(image):
+def detect_landmarks(image_rgb, detect_hands=True, track=False):
     """
-    Process an image to detect arms and draw lines.
+    Run the pose and (optionally) hand landmarkers on an RGB image.
     
     Args:
-        image: Input image as numpy array (BGR format)
+        image_rgb: RGB image
+        detect_hands: Also run the hand landmarker to locate forefingers
+        track: Treat the image as the next frame of a live camera stream and
+            track landmarks from the previous frame (see detect_stream_frame)
     
     Returns:
-        processed_image: Image with arm lines drawn
-        result: Dictionary with detection results
+        pose_landmarks: First person's pose landmarks, or None
+        hand_landmarks_list: List of detected hands (each is a list of landmarks)
     """
-    image_height, image_width = image.shape[:2]
-    
-    # Convert BGR to RGB for MediaPipe
-    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    
-    # Create MediaPipe Image
+    # Create one MediaPipe Image shared by both landmarkers. It holds its own copy
+    # of the pixels, so image_rgb (possibly a reused buffer) is free once it exists.
     mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
     
-    # Use cached landmarkers
-    pose_landmarker = get_pose_landmarker()
-    hand_landmarker = get_hand_landmarker()
-    
     pose_landmarks = None
     hand_landmarks_list = []
+    hand_results = None
+    
+    if track:
+        pose_results, hand_results = detect_stream_frame(mp_image)
+    else:
+        # Detect hands in the background while pose detection runs on this thread
+        if detect_hands:
+            hand_future = _hand_detect_pool.submit(get_hand_landmarker().detect, mp_image)
+        pose_results = get_pose_landmarker().detect(mp_image)
+        if detect_hands:
+            hand_results = hand_future.result()
     
     # Detect pose
-    pose_results = pose_landmarker.detect(mp_image)
     if pose_results.pose_landmarks and len(pose_results.pose_landmarks) > 0:
         pose_landmarks = pose_results.pose_landmarks[0]  # Get first person's landmarks
     
     # Detect hands
-    hand_results = hand_landmarker.detect(mp_image)
-    if hand_results.hand_landmarks:
+    if hand_results is not None and hand_results.hand_landmarks:
         hand_landmarks_list = hand_results.hand_landmarks
     
-    # Draw arm lines
-    processed_image, arms_detected = draw_arm_lines(
-        image.copy(),
-        pose_landmarks,
-        hand_landmarks_list,
-        image_width,
-        image_height
-    )
+    return pose_landmarks, hand_landmarks_list
+
+
+def build_detection_result(pose_landmarks, hand_landmarks_list, image_width, image_height,
+                           arms_detected=None):
+    """
+    Build the detection result dictionary returned by the API.
     
-    # Prepare result data
+    Args:
+        arms_detected: Whether arm lines were drawn; defaults to whether a pose
+            was detected when no drawing was done
+    """
     result = {
-        'arms_detected': arms_detected,
+        'arms_detected': pose_landmarks is not None if arms_detected is None else arms_detected,
         'pose_detected': pose_landmarks is not None,
         'hands_detected': len(hand_landmarks_list) > 0,
         'num_hands': len(hand_landmarks_list)
@@ -316,59 +574,130 @@ def process_image(image):
             image_height
         )
     
+    return result
+
+
+def process_image(image, track=False):
+    """
+    Process an image to detect arms and draw lines.
+    
+    The lines are drawn on the input image in place; pass a copy if the
+    original is still needed.
+    
+    Args:
+        image: Input image as numpy array (BGR format)
+        track: Treat the image as the next frame of a live camera stream and
+            track landmarks from the previous frame (see detect_stream_frame)
+    
+    Returns:
+        processed_image: Image with arm lines drawn
+        result: Dictionary with detection results
+    """
+    image_height, image_width = image.shape[:2]
+    
+    # Convert BGR to RGB for MediaPipe
+    pose_landmarks, hand_landmarks_list = detect_landmarks(
+        bgr_to_rgb(downscale_for_detection(image)), track=track
+    )
+    
+    # Draw arm lines
+    processed_image, arms_detected = draw_arm_lines(
+        image,
+        pose_landmarks,
+        hand_landmarks_list,
+        image_width,
+        image_height
+    )
+    
+    result = build_detection_result(
+        pose_landmarks, hand_landmarks_list, image_width, image_height, arms_detected
+    )
+    
     return processed_image, result
 
-def process_image_landmarks(image):
+def process_image_landmarks(image, detect_hands=True):
     
 
-    """Extract arm landmarks from an image."""
+    """
+    Extract arm landmarks from an image.
+    
+    Args:
+        image: BGR image
+        detect_hands: Also run the hand landmarker to locate forefingers; callers
+            that only use shoulder, elbow and wrist can skip it
+    """
     image_height, image_width = image.shape[:2]
     
     # Convert BGR to RGB for MediaPipe
-    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    pose_landmarks, hand_landmarks_list = detect_landmarks(
+        bgr_to_rgb(downscale_for_detection(image)), detect_hands
+    )
     
-    # Create MediaPipe Image
-    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
+    return build_detection_result(pose_landmarks, hand_landmarks_list, image_width, image_height)
+
+
+def process_image_landmarks_rgb(image_rgb, detect_hands=True):
+    """Extract arm landmarks from an image that is already RGB (see process_image_landmarks)."""
+    image_height, image_width = image_rgb.shape[:2]
     
-    # Use cached landmarkers
-    pose_landmarker = get_pose_landmarker()
-    hand_landmarker = get_hand_landmarker()
+    pose_landmarks, hand_landmarks_list = detect_landmarks(
+        downscale_for_detection(image_rgb), detect_hands
+    )
     
-    pose_landmarks = None
-    hand_landmarks_list = []
+    return build_detection_result(pose_landmarks, hand_landmarks_list, image_width, image_height)
+
+
+def process_image_landmarks_array(image, pose_landmarker=None):
+    """
+    Extract arm landmarks from an image as a packed array.
+    
+    Only runs the pose landmarker, since the array carries no forefinger.
+    
+    Args:
+        image: BGR image
+        pose_landmarker: Landmarker to run; defaults to the cached instance
+    
+    Returns:
+        (2, 3, 3) float32 array of pixel x, y and visibility per arm and joint
+        (see ARM_LANDMARK_INDICES), or None if no pose was detected
+    """
+    image_height, image_width = image.shape[:2]
+    
+    image_rgb = bgr_to_rgb(image)
+    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
+    
+    if pose_landmarker is None:
+        pose_landmarker = get_pose_landmarker()
     
-    # Detect pose
     pose_results = pose_landmarker.detect(mp_image)
-    if pose_results.pose_landmarks and len(pose_results.pose_landmarks) > 0:
-        pose_landmarks = pose_results.pose_landmarks[0]  # Get first person's landmarks
+    if not pose_results.pose_landmarks:
+        return None
     
-    # Detect hands
-    hand_results = hand_landmarker.detect(mp_image)
-    if hand_results.hand_landmarks:
-        hand_landmarks_list = hand_results.hand_landmarks
-
-    result = {
-        'arms_detected': pose_landmarks is not None,
-        'pose_detected': pose_landmarks is not None,
-        'hands_detected': len(hand_landmarks_list) > 0,
-        'num_hands': len(hand_landmarks_list)
-    }
+    return extract_arm_landmarks_array(pose_results.pose_landmarks[0], image_width, image_height)
 
-    # Extract arm landmarks if pose detected
-    if pose_landmarks:
-        result['landmarks'] = extract_arm_landmarks(
-            pose_landmarks,
-            hand_landmarks_list,
-            image_width,
-            image_height
-        )
 
-    return result
+def extract_arm_landmarks_array(pose_landmarks, image_width, image_height):
+    """Pack arm landmarks into a (2, 3, 3) array of pixel x, y and visibility."""
+    arm_array = np.empty((len(ARM_LANDMARK_INDICES), 3, 3), dtype=np.float32)
+    
+    for a, joint_indices in enumerate(ARM_LANDMARK_INDICES):
+        for j, index in enumerate(joint_indices):
+            landmark = pose_landmarks[index]
+            arm_array[a, j] = (
+                int(landmark.x * image_width),
+                int(landmark.y * image_height),
+                getattr(landmark, 'visibility', getattr(landmark, 'presence', 1.0))
+            )
+    
+    return arm_array
 
 
 def extract_arm_landmarks(pose_landmarks, hand_landmarks_list, image_width, image_height):
     """Extract arm landmark coordinates for API response."""
     landmarks = pose_landmarks
+    landmarks_px = landmarks_to_px(landmarks, image_width, image_height).tolist()
+    visibility = landmarks_visibility(landmarks).tolist()
+    hands_px = hands_to_px(hand_landmarks_list, image_width, image_height)
     
     arm_data = {
         'left_arm': {},
@@ -378,93 +707,89 @@ def extract_arm_landmarks(pose_landmarks, hand_landmarks_list, image_width, imag
     def get_visibility(landmark):
         return getattr(landmark, 'visibility', getattr(landmark, 'presence', 1.0))
     
+    def get_joint(index):
+        x, y = landmarks_px[index]
+        return {'x': x, 'y': y, 'visibility': visibility[index]}
+    
     # Helper function to find forefinger for a wrist
-    def get_forefinger_for_wrist(wrist_landmark, hand_landmarks_list, image_width, image_height):
+    def get_forefinger_for_wrist(wrist_px):
         """Get forefinger coordinates matching a wrist position."""
-        if not hand_landmarks_list:
+        index = match_hand(wrist_px, hands_px, image_width, image_height)
+        if index < 0:
             return None
         
-        wrist_px = get_landmark_pixel_coords(wrist_landmark, image_width, image_height)
-        best_hand = None
-        min_distance = float('inf')
-        
-        for hand_landmarks in hand_landmarks_list:
-            hand_wrist = hand_landmarks[HandLandmark.WRIST]
-            hand_wrist_px = get_landmark_pixel_coords(hand_wrist, image_width, image_height)
-            
-            distance = np.sqrt(
-                (wrist_px[0] - hand_wrist_px[0])**2 + 
-                (wrist_px[1] - hand_wrist_px[1])**2
-            )
-            
-            threshold = 0.1 * np.sqrt(image_width**2 + image_height**2)
-            
-            if distance < threshold and distance < min_distance:
-                min_distance = distance
-                best_hand = hand_landmarks
-        
-        if best_hand:
-            forefinger = best_hand[HandLandmark.INDEX_FINGER_TIP]
-            return {
-                'x': int(forefinger.x * image_width),
-                'y': int(forefinger.y * image_height),
-                'visibility': get_visibility(forefinger)
-            }
-        return None
+        x, y = hands_px[index][1]
+        return {
+            'x': x,
+            'y': y,
+            'visibility': get_visibility(hand_landmarks_list[index][HandLandmark.INDEX_FINGER_TIP])
+        }
     
     # Left arm
-    left_shoulder = landmarks[PoseLandmark.LEFT_SHOULDER]
-    left_elbow = landmarks[PoseLandmark.LEFT_ELBOW]
-    left_wrist = landmarks[PoseLandmark.LEFT_WRIST]
-    
-    arm_data['left_arm']['shoulder'] = {
-        'x': int(left_shoulder.x * image_width),
-        'y': int(left_shoulder.y * image_height),
-        'visibility': get_visibility(left_shoulder)
-    }
-    arm_data['left_arm']['elbow'] = {
-        'x': int(left_elbow.x * image_width),
-        'y': int(left_elbow.y * image_height),
-        'visibility': get_visibility(left_elbow)
-    }
-    arm_data['left_arm']['wrist'] = {
-        'x': int(left_wrist.x * image_width),
-        'y': int(left_wrist.y * image_height),
-        'visibility': get_visibility(left_wrist)
-    }
+    arm_data['left_arm']['shoulder'] = get_joint(PoseLandmark.LEFT_SHOULDER)
+    arm_data['left_arm']['elbow'] = get_joint(PoseLandmark.LEFT_ELBOW)
+    arm_data['left_arm']['wrist'] = get_joint(PoseLandmark.LEFT_WRIST)
     # Try to find forefinger for left arm
-    forefinger = get_forefinger_for_wrist(left_wrist, hand_landmarks_list, image_width, image_height)
+    forefinger = get_forefinger_for_wrist(landmarks_px[PoseLandmark.LEFT_WRIST])
     if forefinger:
         arm_data['left_arm']['forefinger'] = forefinger
     
     # Right arm
-    right_shoulder = landmarks[PoseLandmark.RIGHT_SHOULDER]
-    right_elbow = landmarks[PoseLandmark.RIGHT_ELBOW]
-    right_wrist = landmarks[PoseLandmark.RIGHT_WRIST]
-    
-    arm_data['right_arm']['shoulder'] = {
-        'x': int(right_shoulder.x * image_width),
-        'y': int(right_shoulder.y * image_height),
-        'visibility': get_visibility(right_shoulder)
-    }
-    arm_data['right_arm']['elbow'] = {
-        'x': int(right_elbow.x * image_width),
-        'y': int(right_elbow.y * image_height),
-        'visibility': get_visibility(right_elbow)
-    }
-    arm_data['right_arm']['wrist'] = {
-        'x': int(right_wrist.x * image_width),
-        'y': int(right_wrist.y * image_height),
-        'visibility': get_visibility(right_wrist)
-    }
+    arm_data['right_arm']['shoulder'] = get_joint(PoseLandmark.RIGHT_SHOULDER)
+    arm_data['right_arm']['elbow'] = get_joint(PoseLandmark.RIGHT_ELBOW)
+    arm_data['right_arm']['wrist'] = get_joint(PoseLandmark.RIGHT_WRIST)
     # Try to find forefinger for right arm
-    forefinger = get_forefinger_for_wrist(right_wrist, hand_landmarks_list, image_width, image_height)
+    forefinger = get_forefinger_for_wrist(landmarks_px[PoseLandmark.RIGHT_WRIST])
     if forefinger:
         arm_data['right_arm']['forefinger'] = forefinger
     
     return arm_data
 
 
+# Default JPEG quality for ?format=jpeg responses
+JPEG_QUALITY = 85
+
+
+def log_request_time(view):
+    """Log how long a request handler took; only timed when debug logging is on."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not logger.isEnabledFor(logging.DEBUG):
+            return view(*args, **kwargs)
+        
+        start_time = time.perf_counter()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            logger.debug("%s finished in %.6f seconds", request.path, time.perf_counter() - start_time)
+    
+    return wrapper
+
+
+def _output_format():
+    """
+    Image encoding requested with ?format=png|jpeg (and ?quality= for JPEG).
+    
+    Returns:
+        (extension, mimetype, encoder params); PNG stays the default
+    """
+    if request.args.get('format', 'png').lower() in ('jpeg', 'jpg'):
+        quality = min(max(request.args.get('quality', JPEG_QUALITY, type=int), 1), 100)
+        return '.jpg', 'image/jpeg', [cv2.IMWRITE_JPEG_QUALITY, quality]
+    return '.png', 'image/png', []
+
+
+def save_output(filename, image):
+    """Write a processed image to output/ in the background, if SAVE_OUTPUTS is set."""
+    if SAVE_OUTPUTS:
+        _disk_pool.submit(cv2.imwrite, os.path.join(OUTPUT_DIR, os.path.basename(filename)), image)
+
+
+def _track_requested():
+    """Whether the request opted into live-stream tracking with ?track=1."""
+    return request.args.get('track', '0').lower() in ('1', 'true')
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -472,6 +797,7 @@ def health_check():
 
 
 @app.route('/detect-arms', methods=['POST'])
+@log_request_time
 def detect_arms():
     """
     Detect arms in an image and draw lines from shoulder to forefinger.
@@ -479,15 +805,16 @@ def detect_arms():
     Accepts:
         - JSON with base64 encoded image: {"image": "base64_string"}
         - Form data with image file: file field named "image"
+        - Optional query param track=1: frames come from one live camera
+          stream, so landmarks are tracked between frames
+        - Optional query params format=png|jpeg and quality=1-100: encoding
+          of the returned image (default PNG; JPEG is much faster to encode)
     
     Returns:
         JSON with:
         - processed_image: base64 encoded image with arm lines drawn
         - detection_result: object with detection details
     """
-    print("Starting timer...")
-    start_time = time.perf_counter()  # High-precision start time
-
     try:
         image = None
         filename = "processed_image.png"  # default
@@ -507,8 +834,7 @@ def detect_arms():
             
             filename = file.filename  # Use the input filename
             # Read image from file
-            file_bytes = np.frombuffer(file.read(), np.uint8)
-            image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+            image = decode_uploaded_image(file)
         
         else:
             return jsonify({'error': 'No image provided. Send base64 JSON or file upload'}), 400
@@ -517,41 +843,32 @@ def detect_arms():
             return jsonify({'error': 'Failed to decode image'}), 400
         
         # Process the image
-        processed_image, result = process_image(image)
+        processed_image, result = process_image(image, track=_track_requested())
 
-        cv2.imwrite(f"output/{filename}", processed_image)
+        save_output(filename, processed_image)
         
         # Encode processed image to base64
-        processed_base64 = encode_image_to_base64(processed_image)
+        ext, mimetype, params = _output_format()
+        processed_base64 = encode_image_to_base64(processed_image, ext, params)
 
-        end_time = time.perf_counter()  # High-precision end time
-        elapsed = end_time - start_time
-        print(f"Execution finished in {elapsed:.6f} seconds.")
-        
         return jsonify({
             'success': True,
-            'processed_image': f'data:image/png;base64,{processed_base64}',
+            'processed_image': f'data:{mimetype};base64,{processed_base64}',
             'detection_result': result
         })
     
     except Exception as e:
-
-        end_time = time.perf_counter()  # High-precision end time
-        elapsed = end_time - start_time
-        print(f"Execution finished in {elapsed:.6f} seconds.")
-
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/detect-arms-raw', methods=['POST'])
+@log_request_time
 def detect_arms_raw():
     """
     Detect arms and return the processed image directly (not base64).
-    Useful for direct image display or saving.
+    Useful for direct image display or saving. Accepts track=1, format and
+    quality like /detect-arms.
     """
-    print("Starting timer...")
-    start_time = time.perf_counter()  # High-precision start time
-
     try:
     
         if 'image' not in request.files:
@@ -563,62 +880,56 @@ def detect_arms_raw():
         
         
         # Read image from file
-        file_bytes = np.frombuffer(file.read(), np.uint8)
-        image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+        image = decode_uploaded_image(file)
         filename = file.filename  # Use the input filename
         
         if image is None:
             return jsonify({'error': 'Failed to decode image'}), 400
         
         # Process the image
-        processed_image, _ = process_image(image)
+        processed_image, _ = process_image(image, track=_track_requested())
 
-        cv2.imwrite(f"output/{filename}", processed_image)
+        save_output(filename, processed_image)
         
-        # Encode to PNG and return
-        _, buffer = cv2.imencode('.png', processed_image)
-
-        end_time = time.perf_counter()  # High-precision end time
-        elapsed = end_time - start_time
+        # Encode to PNG (or JPEG with ?format=jpeg) and return
+        ext, mimetype, params = _output_format()
+        _, buffer = cv2.imencode(ext, processed_image, params)
 
-        print(f"Execution finished in {elapsed:.6f} seconds.")
-        
         return send_file(
             BytesIO(buffer.tobytes()),
-            mimetype='image/png',
+            mimetype=mimetype,
             as_attachment=False
         )
     
     except Exception as e:
-        end_time = time.perf_counter()  # High-precision end time
-        elapsed = end_time - start_time
-
-        print(f"Execution finished in {elapsed:.6f} seconds.")
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/landmarks-only', methods=['POST'])
+@log_request_time
 def landmarks_only():
     """
     Detect arms and return only the landmark coordinates (no image processing).
     Useful for applications that want to draw their own visualizations.
+    
+    With ?include_image=1 the arm lines are also drawn and returned as in
+    /detect-arms, from the same single detection pass.
     """
-    print("Starting timer...")
-    start_time = time.perf_counter()  # High-precision start time
-
     try:
         image = None
+        include_image = request.args.get('include_image', '0').lower() in ('1', 'true')
+        
+        # Without drawing, decode straight to the RGB that MediaPipe expects
+        rgb = not include_image
         
         if request.is_json:
             data = request.get_json()
             if 'image' not in data:
                 return jsonify({'error': 'No image provided in JSON'}), 400
-            image = decode_base64_image(data['image'])
+            image = decode_base64_image(data['image'], rgb=rgb)
         
         elif 'image' in request.files:
-            file = request.files['image']
-            file_bytes = np.frombuffer(file.read(), np.uint8)
-            image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+            image = decode_uploaded_image(request.files['image'], rgb=rgb)
         
         else:
             return jsonify({'error': 'No image provided'}), 400
@@ -626,23 +937,24 @@ def landmarks_only():
         if image is None:
             return jsonify({'error': 'Failed to decode image'}), 400
         
-        result = process_image_landmarks(image)
+        if include_image:
+            processed_image, result = process_image(image)
+            ext, mimetype, params = _output_format()
+            processed_base64 = encode_image_to_base64(processed_image, ext, params)
+            response_data = {
+                'success': True,
+                'processed_image': f'data:{mimetype};base64,{processed_base64}',
+                'detection_result': result
+            }
+        else:
+            response_data = {
+                'success': True,
+                'detection_result': process_image_landmarks_rgb(image)
+            }
 
-        end_time = time.perf_counter()  # High-precision end time
-        elapsed = end_time - start_time
-        print(f"Execution finished in {elapsed:.6f} seconds.")
-        
-        return jsonify({
-            'success': True,
-            'detection_result': result
-        })
+        return jsonify(response_data)
     
     except Exception as e:
-
-        end_time = time.perf_counter()  # High-precision end time
-        elapsed = end_time - start_time
-        print(f"Execution finished in {elapsed:.6f} seconds.")
-
         return jsonify({'error': str(e)}), 500
 
 
@@ -701,12 +1013,10 @@ def compare_pose_endpoint():
             data = request.get_json()
             if 'image' not in data:
                 return jsonify({'error': 'No image provided'}), 400
-            image = decode_base64_image(data['image'])
+            image = decode_base64_image(data['image'], rgb=True)
         
         elif 'image' in request.files:
-            file = request.files['image']
-            file_bytes = np.frombuffer(file.read(), np.uint8)
-            image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+            image = decode_uploaded_image(request.files['image'], rgb=True)
         
         else:
             return jsonify({'error': 'No image provided'}), 400
@@ -715,7 +1025,8 @@ def compare_pose_endpoint():
             return jsonify({'error': 'Failed to decode image'}), 400
         
         # Compare pose
-        result = comparator.compare_image(image)
+        # Inference-only path: the image was decoded straight to RGB
+        result = comparator.compare_image(image, rgb=True)
         flag = comparator.get_comparison_flag(result)
         
         return jsonify({
@@ -726,7 +1037,7 @@ def compare_pose_endpoint():
                     {
                         'joint': fb.joint_name,
                         'arm': fb.arm_name,
-                        'deviation': round(float(fb.deviation, 4)),
+                        'deviation': round(float(fb.deviation), 4),
                         'is_accurate': bool(fb.is_accurate),
                         'message': fb.message
                     }
@@ -757,6 +1068,9 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5500))
     debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
+    # Request timings are logged at debug level
+    logging.basicConfig(level=logging.DEBUG if debug else logging.INFO)
+    
     print(f"Starting Arm Detection Flask App on port {port}")
     print("Endpoints:")
     print("  GET  /health - Health check")
@@ -766,6 +1080,8 @@ if __name__ == '__main__':
     print("  POST /compare-pose - Compare pose against baseline")
     print("  GET  /baseline-status - Check baseline status")
     
+    warmup()
+    
     # Check baseline status on startup
     comparator = get_pose_comparator()
     if _baseline_loaded:
@@ -773,4 +1089,10 @@ if __name__ == '__main__':
     else:
         print("\n⚠ No baseline loaded. Run: python run_baseline_collection.py")
     
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    # The development server is only for debugging; serve with waitress otherwise.
+    # Request threads share this process's single set of landmarkers, so the models
+    # are loaded once however many requests are in flight.
+    if serve is not None and not debug:
+        serve(app, host='0.0.0.0', port=port, threads=8)
+    else:
+        app.run(host='0.0.0.0', port=port, debug=debug)
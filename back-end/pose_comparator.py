@@ -5,15 +5,75 @@ Provides detailed feedback on pose correctness.
 """
 
 import os
-import json
+import math
+import hashlib
+import threading
 import cv2
 import numpy as np
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from operator import itemgetter
 
-from drawingLines import process_image_landmarks
-from baseline_collector import BaselineCollector
+try:
+    import xxhash
+except ImportError:  # Optional; falls back to hashlib for image hashing
+    xxhash = None
+
+from drawingLines import process_image_landmarks, process_image_landmarks_rgb
+from baseline_collector import (
+    BaselineCollector, ARM_NAMES, JOINT_NAMES, ANGLE_NAMES,
+    angle_from_vertical, joint_angle, load_json
+)
+
+# Number of recent images whose detected landmarks are kept per comparator
+DETECTION_CACHE_SIZE = 64
+
+# Larger images are not hashed for the detection cache; hashing a full-resolution
+# frame costs more than the chance of it repeating saves
+HASH_MAX_BYTES = 4_000_000
+
+def image_digest(image: np.ndarray):
+    """
+    Hash an image's pixels for use in cache keys.
+    
+    Args:
+        image: C-contiguous image array
+        
+    Returns:
+        Digest of the pixel data, or None if the image is too large to be
+        worth hashing (see HASH_MAX_BYTES)
+    """
+    if image.nbytes >= HASH_MAX_BYTES:
+        return None
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(image)
+    return hashlib.blake2b(image, digest_size=8).digest()
+
+
+# Feedback strings that do not depend on the frame, built once
+JOINT_CORRECT_MESSAGES = tuple(f"{joint_name.capitalize()} position is correct" for joint_name in JOINT_NAMES)
+ANGLE_LABELS = tuple(angle_name.replace('_', ' ') for angle_name in ANGLE_NAMES)
+ANGLE_CORRECT_MESSAGES = tuple(f"{label.capitalize()} is correct" for label in ANGLE_LABELS)
+# (too large, too small) adjustment words per angle
+ANGLE_ADJUSTMENTS = tuple(
+    ("decrease", "increase") if 'elbow' in angle_name else ("lower", "raise")
+    for angle_name in ANGLE_NAMES
+)
+
+
+def _direction_text(horizontal: int, vertical: int) -> str:
+    """Direction for the sign of an x/y deviation (-1, 0 or 1 each)."""
+    directions = [{1: "left", -1: "right"}.get(horizontal), {1: "down", -1: "up"}.get(vertical)]
+    return " and ".join(d for d in directions if d) or "slightly"
+
+
+# DIRECTIONS[horizontal + 1][vertical + 1]
+DIRECTIONS = tuple(
+    tuple(_direction_text(horizontal, vertical) for vertical in (-1, 0, 1))
+    for horizontal in (-1, 0, 1)
+)
 
 
 class AccuracyLevel(Enum):
@@ -28,6 +88,9 @@ class AccuracyLevel(Enum):
 @dataclass
 class JointFeedback:
     """Feedback for a single joint."""
+    # Explicit __slots__ rather than dataclass(slots=True), which needs Python 3.10
+    __slots__ = ('joint_name', 'arm_name', 'deviation', 'angle_deviation', 'is_accurate', 'message')
+    
     joint_name: str
     arm_name: str
     deviation: float  # Normalized deviation (0-1)
@@ -39,6 +102,9 @@ class JointFeedback:
 @dataclass
 class PoseComparisonResult:
     """Result of comparing a pose against baseline."""
+    __slots__ = ('overall_accuracy', 'accuracy_level', 'is_accurate', 'joint_feedback',
+                 'angle_feedback', 'summary_message', 'detailed_report')
+    
     overall_accuracy: float  # 0-100 percentage
     accuracy_level: AccuracyLevel
     is_accurate: bool
@@ -48,6 +114,67 @@ class PoseComparisonResult:
     detailed_report: Dict
 
 
+def pack_joints(landmarks: Dict, keys: Tuple[str, ...]) -> np.ndarray:
+    """
+    Pack per-joint values from a nested landmark dict into an array.
+    
+    Args:
+        landmarks: Nested {arm: {joint: {key: value}}} landmark dict
+        keys: Joint fields to pack, e.g. ('x', 'y')
+        
+    Returns:
+        (arms, joints, len(keys)) float32 array ordered like ARM_NAMES and
+        JOINT_NAMES, NaN where a joint or field is missing
+    """
+    get_values = itemgetter(*keys)
+    missing = (np.nan,) * len(keys)
+    
+    rows = []
+    for arm_name in ARM_NAMES:
+        arm_data = landmarks.get(arm_name) or {}
+        for joint_name in JOINT_NAMES:
+            joint = arm_data.get(joint_name)
+            try:
+                rows.append(get_values(joint) if joint is not None else missing)
+            except KeyError:
+                rows.append(missing)
+    
+    return np.array(rows, dtype=np.float32).reshape(len(ARM_NAMES), len(JOINT_NAMES), len(keys))
+
+
+def pack_angles(angles: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack baseline angles from a nested angle dict into arrays.
+    
+    Args:
+        angles: Nested {arm: {angle: value}} dict, where each value is either a
+            float or a {'value', 'std'} dict
+            
+    Returns:
+        Tuple of (values, std) (arms, angles) float64 arrays ordered like
+        ARM_NAMES and ANGLE_NAMES, NaN where an angle is missing
+    """
+    values = np.full((len(ARM_NAMES), len(ANGLE_NAMES)), np.nan)
+    std = np.full_like(values, np.nan)
+    
+    for a, arm_name in enumerate(ARM_NAMES):
+        arm_angles = angles.get(arm_name) or {}
+        for k, angle_name in enumerate(ANGLE_NAMES):
+            angle = arm_angles.get(angle_name)
+            if angle is None:
+                continue
+            
+            # Handle both dict and float formats
+            if isinstance(angle, dict):
+                values[a, k] = angle['value']
+                std[a, k] = angle.get('std', 0)
+            else:
+                values[a, k] = angle
+                std[a, k] = 0
+    
+    return values, std
+
+
 class PoseComparator:
     """Compares poses against a baseline and provides accuracy feedback."""
     
@@ -72,6 +199,22 @@ class PoseComparator:
         self.accuracy_threshold = accuracy_threshold
         self.baseline_data = None
         
+        # Baseline joint positions packed as (arms, joints, xy) plus per-joint std,
+        # NaN where the baseline has no joint
+        self.baseline_xy = None
+        self.baseline_std = None
+        self._position_thresholds = None
+        
+        # Baseline angles packed as (arms, angles) plus their std, NaN where missing
+        self.baseline_angle_values = None
+        self.baseline_angle_std = None
+        self._angle_thresholds = None
+        
+        # Detected landmarks of recent images, keyed by pixel hash or file stat,
+        # so repeated inputs skip decoding and pose detection
+        self._detection_cache: "OrderedDict[Tuple, Tuple[Dict, int, int]]" = OrderedDict()
+        self._detection_cache_lock = threading.Lock()
+        
     def load_baseline(self, path: str = None) -> Dict:
         """Load baseline data from file."""
         load_path = path or self.baseline_path
@@ -79,21 +222,51 @@ class PoseComparator:
         if not os.path.exists(load_path):
             raise FileNotFoundError(f"Baseline file not found: {load_path}")
         
-        with open(load_path, 'r') as f:
-            self.baseline_data = json.load(f)
+        self.set_baseline(load_json(load_path))
         
         return self.baseline_data
     
     def set_baseline(self, baseline_data: Dict):
         """Set baseline data directly."""
         self.baseline_data = baseline_data
+        
+        baseline_landmarks = baseline_data['baseline_landmarks']
+        self.baseline_xy = pack_joints(baseline_landmarks, ('x', 'y'))
+        std_xy = pack_joints(baseline_landmarks, ('std_x', 'std_y'))
+        self.baseline_std = np.hypot(std_xy[..., 0], std_xy[..., 1])
+        self._position_thresholds = None
+        
+        self.baseline_angle_values, self.baseline_angle_std = pack_angles(baseline_data['baseline_angles'])
+        self._angle_thresholds = None
+    
+    def _get_position_thresholds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-joint position thresholds for the current baseline and setting.
+        
+        Returns:
+            Tuple of (thresholds, score divisors); divisors are inf where the
+            threshold is not positive so those joints score 100
+        """
+        if self._position_thresholds is None or self._position_thresholds[0] != self.position_threshold:
+            # Allow up to 2 standard deviations where the baseline has them
+            thresholds = np.fmax(self.position_threshold, self.baseline_std * 2)
+            divisors = np.where(thresholds > 0, thresholds, np.inf)
+            self._position_thresholds = (self.position_threshold, thresholds, divisors)
+        
+        return self._position_thresholds[1:]
+    
+    def _get_angle_thresholds(self) -> List[List[float]]:
+        """Per-angle thresholds for the current baseline and setting, as (arms, angles) lists."""
+        if self._angle_thresholds is None or self._angle_thresholds[0] != self.angle_threshold:
+            # Allow up to 2 standard deviations where the baseline has them
+            thresholds = np.maximum(self.angle_threshold, self.baseline_angle_std * 2)
+            self._angle_thresholds = (self.angle_threshold, thresholds.tolist())
+        
+        return self._angle_thresholds[1]
     
     def normalize_landmarks(self, landmarks: Dict, image_width: int, image_height: int) -> Dict:
         """Normalize landmark coordinates to 0-1 range."""
         normalized = {}
-
-        print(landmarks)
-        print(landmarks.items())
         
         for arm_name, arm_data in landmarks.items():
             normalized[arm_name] = {}
@@ -122,14 +295,14 @@ class PoseComparator:
                 wrist = arm_data['wrist']
                 
                 # Calculate elbow angle
-                elbow_angle = self._calculate_angle(
+                elbow_angle = joint_angle(
                     (shoulder['x'], shoulder['y']),
                     (elbow['x'], elbow['y']),
                     (wrist['x'], wrist['y'])
                 )
                 
                 # Calculate shoulder angle
-                shoulder_angle = self._calculate_angle_from_vertical(
+                shoulder_angle = angle_from_vertical(
                     (shoulder['x'], shoulder['y']),
                     (elbow['x'], elbow['y'])
                 )
@@ -141,27 +314,6 @@ class PoseComparator:
         
         return angles
     
-    def _calculate_angle(self, point1: Tuple[float, float], 
-                         point2: Tuple[float, float], 
-                         point3: Tuple[float, float]) -> float:
-        """Calculate the angle at point2 formed by point1-point2-point3."""
-        v1 = np.array([point1[0] - point2[0], point1[1] - point2[1]])
-        v2 = np.array([point3[0] - point2[0], point3[1] - point2[1]])
-        
-        cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2) + 1e-6)
-        cos_angle = np.clip(cos_angle, -1.0, 1.0)
-        angle = np.arccos(cos_angle)
-        
-        return np.degrees(angle)
-    
-    def _calculate_angle_from_vertical(self, point1: Tuple[float, float], 
-                                        point2: Tuple[float, float]) -> float:
-        """Calculate the angle of the line from point1 to point2 relative to vertical."""
-        dx = point2[0] - point1[0]
-        dy = point2[1] - point1[1]
-        angle = np.degrees(np.arctan2(dx, dy))
-        return angle
-    
     def compare_pose(self, current_landmarks: Dict, 
                      image_width: int, 
                      image_height: int) -> PoseComparisonResult:
@@ -179,8 +331,6 @@ class PoseComparator:
         if self.baseline_data is None:
             self.load_baseline()
         
-        baseline_landmarks = self.baseline_data['baseline_landmarks']
-        baseline_angles = self.baseline_data['baseline_angles']
 
         if(current_landmarks is False):
             return PoseComparisonResult(
@@ -237,77 +387,69 @@ class PoseComparator:
         # Calculate current angles
         current_angles = self.calculate_joint_angles(normalized_current)
         
-        # Compare positions
+        # Compare positions for all joints at once against the packed baseline
         joint_feedback = []
         position_scores = []
         
-        for arm_name in ['left_arm', 'right_arm']:
-            baseline_arm = baseline_landmarks.get(arm_name, {})
-            current_arm = normalized_current.get(arm_name, {})
+        offset = pack_joints(normalized_current, ('x', 'y')) - self.baseline_xy
+        deviations = np.hypot(offset[..., 0], offset[..., 1])
+        
+        thresholds, divisors = self._get_position_thresholds()
+        scores = np.maximum(0, 1 - deviations / divisors) * 100
+        is_accurate_all = deviations <= thresholds
+        
+        # Plain lists keep the per-joint feedback loop free of NumPy scalar overhead
+        offset = offset.tolist()
+        deviations = deviations.tolist()
+        scores = scores.tolist()
+        is_accurate_all = is_accurate_all.tolist()
+        
+        for a, arm_name in enumerate(ARM_NAMES):
+            for j, joint_name in enumerate(JOINT_NAMES):
+                deviation = deviations[a][j]
+                if math.isnan(deviation):
+                    continue
+                
+                is_accurate = is_accurate_all[a][j]
+                position_scores.append(scores[a][j])
+                
+                # Generate feedback message
+                if is_accurate:
+                    message = JOINT_CORRECT_MESSAGES[j]
+                else:
+                    direction = self._get_direction(*offset[a][j])
+                    message = f"Adjust {joint_name}: move {direction}"
             
-            for joint_name in ['shoulder', 'elbow', 'wrist']:
-                if joint_name in baseline_arm and joint_name in current_arm:
-                    baseline_joint = baseline_arm[joint_name]
-                    current_joint = current_arm[joint_name]
-                    
-                    # Calculate position deviation
-                    dx = current_joint['x'] - baseline_joint['x']
-                    dy = current_joint['y'] - baseline_joint['y']
-                    deviation = np.sqrt(dx**2 + dy**2)
-                    
-                    # Account for baseline standard deviation if available
-                    threshold = self.position_threshold
-                    if 'std_x' in baseline_joint and 'std_y' in baseline_joint:
-                        std = np.sqrt(baseline_joint['std_x']**2 + baseline_joint['std_y']**2)
-                        threshold = max(threshold, std * 2)  # 2 standard deviations
-                    
-                    is_accurate = deviation <= threshold
-                    score = max(0, 1 - (deviation / threshold)) * 100 if threshold > 0 else 100
-                    position_scores.append(score)
-                    
-                    # Generate feedback message
-                    if is_accurate:
-                        message = f"{joint_name.capitalize()} position is correct"
-                    else:
-                        direction = self._get_direction(dx, dy)
-                        message = f"Adjust {joint_name}: move {direction}"
-                    
-                    joint_feedback.append(JointFeedback(
-                        joint_name=joint_name,
-                        arm_name=arm_name,
-                        deviation=deviation,
-                        angle_deviation=None,
-                        is_accurate=is_accurate,
-                        message=message
-                    ))
+                joint_feedback.append(JointFeedback(
+                    joint_name=joint_name,
+                    arm_name=arm_name,
+                    deviation=deviation,
+                    angle_deviation=None,
+                    is_accurate=is_accurate,
+                    message=message
+                ))
         
         # Compare angles
         angle_feedback = {}
         angle_scores = []
         
-        for arm_name in ['left_arm', 'right_arm']:
-            baseline_arm_angles = baseline_angles.get(arm_name, {})
+        baseline_angle_values = self.baseline_angle_values.tolist()
+        angle_thresholds = self._get_angle_thresholds()
+        
+        for a, arm_name in enumerate(ARM_NAMES):
             current_arm_angles = current_angles.get(arm_name, {})
             angle_feedback[arm_name] = {}
             
-            for angle_name in ['elbow_angle', 'shoulder_angle']:
-                if angle_name in baseline_arm_angles and angle_name in current_arm_angles:
-                    baseline_angle = baseline_arm_angles[angle_name]
+            for k, angle_name in enumerate(ANGLE_NAMES):
+                baseline_value = baseline_angle_values[a][k]
+                if not math.isnan(baseline_value) and angle_name in current_arm_angles:
                     current_angle = current_arm_angles[angle_name]
                     
-                    # Get baseline value (handle both dict and float formats)
-                    if isinstance(baseline_angle, dict):
-                        baseline_value = baseline_angle['value']
-                        angle_std = baseline_angle.get('std', 0)
-                    else:
-                        baseline_value = baseline_angle
-                        angle_std = 0
-                    
                     # Calculate angle deviation
                     angle_deviation = abs(current_angle - baseline_value)
                     
-                    # Adjust threshold based on standard deviation
-                    threshold = max(self.angle_threshold, angle_std * 2)
+                    # Threshold is already widened by the baseline standard deviation
+                    threshold = angle_thresholds[a][k]
                     
                     is_accurate = angle_deviation <= threshold
                     score = max(0, 1 - (angle_deviation / threshold)) * 100 if threshold > 0 else 100
@@ -315,13 +457,10 @@ class PoseComparator:
                     
                     # Generate feedback
                     if is_accurate:
-                        message = f"{angle_name.replace('_', ' ').capitalize()} is correct"
+                        message = ANGLE_CORRECT_MESSAGES[k]
                     else:
-                        if current_angle > baseline_value:
-                            adjustment = "decrease" if 'elbow' in angle_name else "lower"
-                        else:
-                            adjustment = "increase" if 'elbow' in angle_name else "raise"
-                        message = f"Adjust {angle_name.replace('_', ' ')}: {adjustment} by {angle_deviation:.1f}°"
+                        adjustment = ANGLE_ADJUSTMENTS[k][0 if current_angle > baseline_value else 1]
+                        message = f"Adjust {ANGLE_LABELS[k]}: {adjustment} by {angle_deviation:.1f}°"
                     
                     angle_feedback[arm_name][angle_name] = {
                         'baseline': baseline_value,
@@ -332,8 +471,8 @@ class PoseComparator:
                     }
         
         # Calculate overall accuracy
-        all_scores = position_scores + angle_scores
-        overall_accuracy = np.mean(all_scores) if all_scores else 0
+        score_count = len(position_scores) + len(angle_scores)
+        overall_accuracy = (sum(position_scores) + sum(angle_scores)) / score_count if score_count else 0
         
         # Determine accuracy level
         if overall_accuracy >= 90:
@@ -381,27 +520,61 @@ class PoseComparator:
     
     def _get_direction(self, dx: float, dy: float) -> str:
         """Get human-readable direction based on deviation."""
-        directions = []
-        
-        if abs(dx) > 0.02:
-            directions.append("left" if dx > 0 else "right")
-        if abs(dy) > 0.02:
-            directions.append("down" if dy > 0 else "up")
-        
-        return " and ".join(directions) if directions else "slightly"
+        horizontal = (dx > 0.02) - (dx < -0.02)
+        vertical = (dy > 0.02) - (dy < -0.02)
+        return DIRECTIONS[horizontal + 1][vertical + 1]
     
-    def compare_image(self, image: np.ndarray) -> PoseComparisonResult:
-        """
-        Compare pose in an image against the baseline.
-        
-        Args:
-            image: Input image as numpy array (BGR format)
-            
-        Returns:
-            PoseComparisonResult with accuracy details
-        """
-        result = process_image_landmarks(image)
+    def cache_clear(self):
+        """Drop the cached detections of previously compared images."""
+        with self._detection_cache_lock:
+            self._detection_cache.clear()
+    
+    def _get_cached_detection(self, key: Tuple) -> Optional[Tuple[Dict, int, int]]:
+        """Get the cached (landmark result, width, height) for a key, or None."""
+        with self._detection_cache_lock:
+            value = self._detection_cache.get(key)
+            if value is not None:
+                self._detection_cache.move_to_end(key)
+            return value
+    
+    def _cache_detection(self, key: Tuple, value: Tuple[Dict, int, int]):
+        """Cache a detection, evicting the least recently used."""
+        with self._detection_cache_lock:
+            self._detection_cache[key] = value
+            self._detection_cache.move_to_end(key)
+            while len(self._detection_cache) > DETECTION_CACHE_SIZE:
+                self._detection_cache.popitem(last=False)
+    
+    def _run_detection(self, image: np.ndarray, rgb: bool) -> Tuple[Dict, int, int]:
+        """Detect landmarks in an image without consulting the cache."""
+        # The comparison never uses forefingers, so skip hand detection
+        if rgb:
+            result = process_image_landmarks_rgb(image, detect_hands=False)
+        else:
+            result = process_image_landmarks(image, detect_hands=False)
         
+        image_height, image_width = image.shape[:2]
+        return result, image_width, image_height
+    
+    def _detect_image(self, image: np.ndarray, rgb: bool, digest=None) -> Tuple[Dict, int, int]:
+        """Detect landmarks in an image, reusing the result for identical pixels."""
+        image = np.ascontiguousarray(image)
+        if digest is None:
+            digest = image_digest(image)
+        if digest is None:
+            return self._run_detection(image, rgb)
+        key = ('image', rgb, image.shape, digest)
+        
+        cached = self._get_cached_detection(key)
+        if cached is not None:
+            return cached
+        
+        detection = self._run_detection(image, rgb)
+        self._cache_detection(key, detection)
+        return detection
+    
+    def _compare_detection(self, result: Dict, image_width: int, image_height: int) -> PoseComparisonResult:
+        """Compare a landmark detection result against the baseline."""
         if not result.get('pose_detected') or not result.get('landmarks'):
             return PoseComparisonResult(
                 overall_accuracy=0,
@@ -413,24 +586,52 @@ class PoseComparator:
                 detailed_report={'error': 'No pose detected'}
             )
         
-        image_height, image_width = image.shape[:2]
-        
         return self.compare_pose(
             result['landmarks'],
             image_width,
             image_height
         )
     
+    def compare_image(self, image: np.ndarray, rgb: bool = False, digest=None) -> PoseComparisonResult:
+        """
+        Compare pose in an image against the baseline.
+        
+        Detections of images smaller than HASH_MAX_BYTES are cached by pixel
+        hash, so comparing the same image again only reruns the comparison.
+        
+        Args:
+            image: Input image as numpy array (BGR format)
+            rgb: The image is RGB already, so no color conversion is needed
+            digest: image_digest of the image, if the caller already hashed it
+            
+        Returns:
+            PoseComparisonResult with accuracy details
+        """
+        return self._compare_detection(*self._detect_image(image, rgb, digest))
+    
     def compare_image_file(self, image_path: str) -> PoseComparisonResult:
         """
         Compare pose in an image file against the baseline.
         
+        Detections are cached by path, modification time and size, so an
+        unchanged file is not decoded again.
+        
         Args:
             image_path: Path to the image file
             
         Returns:
             PoseComparisonResult with accuracy details
         """
+        try:
+            stat = os.stat(image_path)
+            key = ('file', os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            key = None
+        
+        cached = self._get_cached_detection(key) if key is not None else None
+        if cached is not None:
+            return self._compare_detection(*cached)
+        
         image = cv2.imread(image_path)
         if image is None:
             return PoseComparisonResult(
@@ -443,7 +644,11 @@ class PoseComparator:
                 detailed_report={'error': 'Image read failed'}
             )
         
-        return self.compare_image(image)
+        # The file key replaces the pixel hash, so detect without it
+        detection = self._run_detection(image, rgb=False)
+        if key is not None:
+            self._cache_detection(key, detection)
+        return self._compare_detection(*detection)
     
     def get_comparison_flag(self, result: PoseComparisonResult) -> Dict:
         """
@@ -457,10 +662,10 @@ class PoseComparator:
         """
         return {
             'is_accurate': result.is_accurate,
-            'accuracy_percentage': round(float(result.overall_accuracy, 2)),
+            'accuracy_percentage': round(float(result.overall_accuracy), 2),
             'accuracy_level': result.accuracy_level.value,
             'message': result.summary_message,
-            'needs_correction': bool(not result.is_accurate),
+            'needs_correction': not result.is_accurate,
             'corrections': [
                 {
                     'joint': fb.joint_name,
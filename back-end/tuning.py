@@ -8,19 +8,43 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import parselmouth
 from parselmouth.praat import call
+import math
 import numpy as np
-from io import BytesIO
 import soundfile as sf
 import tempfile
 import os
 
+from json_provider import OrjsonProvider
+
+try:
+    from scipy.signal import resample_poly
+except ImportError:  # Optional; falls back to analyzing at the file's sample rate
+    resample_poly = None
+
+try:
+    from waitress import serve
+except ImportError:  # Optional; falls back to the Flask development server
+    serve = None
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+app.json.sort_keys = False  # Clients never rely on key order; skip sorting every response
 CORS(app)
 
 # Note to frequency mapping
 NOTES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
 A4_FREQ = 440.0  # Standard tuning frequency
 
+# Equal-tempered note frequencies from C0 to B8, indexed by semitones from A4
+# plus SEMITONE_OFFSET (A4 is 57 semitones above C0)
+SEMITONE_OFFSET = 57
+NOTE_FREQUENCIES = (A4_FREQ * 2 ** ((np.arange(9 * 12) - SEMITONE_OFFSET) / 12)).tolist()
+FULL_NOTE_NAMES = [f'{note}{octave}' for octave in range(9) for note in NOTES]
+
+# Sample rate used for pitch detection. The pitch ceiling is 4000 Hz, so
+# 16 kHz keeps it well under Nyquist while cutting 44.1/48 kHz input ~3x.
+ANALYSIS_SAMPLE_RATE = 16000
+
 
 def frequency_to_note(freq):
     """
@@ -36,7 +60,7 @@ def frequency_to_note(freq):
         return None
     
     # Calculate semitones from A4 (440 Hz)
-    semitones_from_a4 = 12 * np.log2(freq / A4_FREQ)
+    semitones_from_a4 = 12 * math.log2(freq / A4_FREQ)
     
     # Find nearest semitone
     nearest_semitone = round(semitones_from_a4)
@@ -47,16 +71,23 @@ def frequency_to_note(freq):
     
     note_name = NOTES[note_index]
     
-    # Calculate exact frequency of the nearest note
-    exact_freq = A4_FREQ * (2 ** (nearest_semitone / 12))
+    # Look up the exact frequency and name of the nearest note
+    table_index = nearest_semitone + SEMITONE_OFFSET
+    if 0 <= table_index < len(NOTE_FREQUENCIES):
+        exact_freq = NOTE_FREQUENCIES[table_index]
+        full_note = FULL_NOTE_NAMES[table_index]
+    else:
+        exact_freq = A4_FREQ * (2 ** (nearest_semitone / 12))
+        full_note = f'{note_name}{octave}'
     
-    # Calculate cents off (how many cents sharp/flat)
-    cents_off = 100 * (np.log2(freq / exact_freq))
+    # Calculate cents off (how many cents sharp/flat); log2(freq / exact_freq)
+    # is the semitone remainder over 12, so no second log is needed
+    cents_off = 100 * (semitones_from_a4 - nearest_semitone) / 12
     
     return {
         'note': note_name,
         'octave': octave,
-        'full_note': f'{note_name}{octave}',
+        'full_note': full_note,
         'frequency': freq,
         'nearest_frequency': exact_freq,
         'cents_off': cents_off,
@@ -65,6 +96,101 @@ def frequency_to_note(freq):
     }
 
 
+def frequencies_to_notes(freqs):
+    """
+    Convert an array of frequencies to their nearest notes in one pass.
+    
+    Args:
+        freqs: Array of positive frequencies in Hz
+    
+    Returns:
+        List of note dictionaries as returned by frequency_to_note, with
+        plain Python values
+    """
+    semitones_from_a4 = 12 * np.log2(freqs / A4_FREQ)
+    nearest_semitones = np.round(semitones_from_a4)
+    
+    semitone_index = nearest_semitones.astype(np.int64) + 9  # A is index 9
+    note_indices = (semitone_index % 12).tolist()
+    octaves = (4 + semitone_index // 12).tolist()
+    
+    exact_freqs = A4_FREQ * 2 ** (nearest_semitones / 12)
+    cents_off = 100 * (semitones_from_a4 - nearest_semitones) / 12
+    
+    notes = []
+    for note_index, octave, freq, exact_freq, cents in zip(
+            note_indices, octaves, freqs.tolist(), exact_freqs.tolist(), cents_off.tolist()):
+        note_name = NOTES[note_index]
+        # Names for C0-B8 come from the table; only frequencies outside it are formatted
+        full_note = (FULL_NOTE_NAMES[octave * 12 + note_index] if 0 <= octave < 9
+                     else f'{note_name}{octave}')
+        notes.append({
+            'note': note_name,
+            'octave': octave,
+            'full_note': full_note,
+            'frequency': freq,
+            'nearest_frequency': exact_freq,
+            'cents_off': cents,
+            'is_sharp': cents > 0,
+            'is_flat': cents < 0
+        })
+    
+    return notes
+
+
+def read_audio(file, max_seconds):
+    """
+    Decode the start of an uploaded audio file as mono float64 samples,
+    downsampled for pitch detection.
+    
+    Args:
+        file: Uploaded file (werkzeug FileStorage)
+        max_seconds: Number of seconds to decode from the start of the file
+    
+    Returns:
+        Tuple of (audio, sample_rate)
+    """
+    # soundfile reads straight from the upload stream and stops after
+    # max_seconds, so the rest of the file is never copied or decoded.
+    # Praat stores samples as float64, so decoding to float64 lets
+    # parselmouth.Sound take them without another conversion copy.
+    with sf.SoundFile(file.stream) as f:
+        sr = f.samplerate
+        audio = f.read(int(sr * max_seconds), dtype='float64')
+    
+    # Convert stereo to mono if needed
+    if audio.ndim > 1:
+        audio = np.mean(audio, axis=1)
+    
+    return downsample(audio, sr)
+
+
+def downsample(audio, sr, target_sr=ANALYSIS_SAMPLE_RATE):
+    """
+    Resample audio down to target_sr for pitch detection.
+    
+    Praat's autocorrelation cost grows with the number of samples, and the
+    violin's range never needs more than target_sr. Audio already at or
+    below target_sr, or when scipy is not installed, is returned unchanged.
+    
+    Args:
+        audio: Mono audio samples
+        sr: Sample rate of audio
+        target_sr: Sample rate to resample to
+    
+    Returns:
+        Tuple of (audio, sample_rate)
+    """
+    if resample_poly is None or sr <= target_sr or len(audio) == 0:
+        return audio, sr
+    
+    # Polyphase FIR resampling by the exact rational factor target_sr / sr
+    g = math.gcd(target_sr, sr)
+    audio = resample_poly(audio, target_sr // g, sr // g)
+    
+    return audio, target_sr
+
+
 def detect_pitch_praat(audio, sr):
     """
     Detect pitch using Praat's autocorrelation method - VERY FAST and ACCURATE.
@@ -148,13 +274,8 @@ def detect_note():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        # Load audio file using soundfile (faster than librosa)
-        audio_data = file.read()
-        audio, sr = sf.read(BytesIO(audio_data), dtype='float32')
-        
-        # Convert stereo to mono if needed
-        if len(audio.shape) > 1:
-            audio = np.mean(audio, axis=1)
+        # Only the first 1.5 seconds are analyzed (see detect_pitch_praat)
+        audio, sr = read_audio(file, max_seconds=1.5)
         
         if len(audio) == 0:
             return jsonify({'error': 'Failed to load audio file'}), 400
@@ -183,12 +304,8 @@ def detect_note():
                 'confidence': confidence
             }), 200
         
-        note_info['confidence'] = float(confidence)
-        note_info['frequency'] = float(detected_freq)
-        note_info['nearest_frequency'] = float(note_info['nearest_frequency'])
-        note_info['cents_off'] = float(note_info['cents_off'])
-        note_info['is_sharp'] = bool(note_info['is_sharp'])
-        note_info['is_flat'] = bool(note_info['is_flat'])
+        # frequency_to_note already returns plain floats and bools
+        note_info['confidence'] = confidence
         
         return jsonify({
             'success': True,
@@ -214,21 +331,12 @@ def detect_note_detailed():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        # Load audio file using soundfile (faster than librosa)
-        audio_data = file.read()
-        audio, sr = sf.read(BytesIO(audio_data), dtype='float32')
-        
-        # Convert stereo to mono if needed
-        if len(audio.shape) > 1:
-            audio = np.mean(audio, axis=1)
+        # Limit to first 5 seconds for speed
+        audio, sr = read_audio(file, max_seconds=5)
         
         if len(audio) == 0:
             return jsonify({'error': 'Failed to load audio file'}), 400
         
-        # Limit to first 5 seconds for speed
-        max_samples = min(int(sr * 5), len(audio))
-        audio = audio[:max_samples]
-        
         # Create Praat Sound object and extract pitch
         sound = parselmouth.Sound(audio, sampling_frequency=sr)
         pitch = sound.to_pitch_ac(
@@ -238,23 +346,14 @@ def detect_note_detailed():
             very_accurate=False
         )
         
-        notes_list = []
+        # Read every frame's pitch at once; unvoiced frames are 0 Hz
+        pitch_values = pitch.selected_array['frequency']
+        voiced = pitch_values > 0
         
-        # Get pitch values at each time frame
-        times = pitch.xs()
-        for t in times:
-            freq = pitch.get_value_at_time(t)
-            if freq and freq > 0:
-                note_info = frequency_to_note(float(freq))
-                if note_info:
-                    note_info['time'] = float(t)
-                    note_info['confidence'] = 0.85
-                    note_info['frequency'] = float(freq)
-                    note_info['nearest_frequency'] = float(note_info['nearest_frequency'])
-                    note_info['cents_off'] = float(note_info['cents_off'])
-                    note_info['is_sharp'] = bool(note_info['is_sharp'])
-                    note_info['is_flat'] = bool(note_info['is_flat'])
-                    notes_list.append(note_info)
+        notes_list = frequencies_to_notes(pitch_values[voiced])
+        for note_info, t in zip(notes_list, pitch.xs()[voiced].tolist()):
+            note_info['time'] = t
+            note_info['confidence'] = 0.85
         
         if not notes_list:
             return jsonify({
@@ -286,4 +385,10 @@ if __name__ == '__main__':
     print("  POST /detect-note - Detect the main note in audio")
     print("  POST /detect-note-detailed - Detect all notes over time")
     
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    # The development server is only for debugging; serve with waitress otherwise.
+    # Pitch analysis is CPU-bound, so scale across cores with processes:
+    # gunicorn -w 4 -b 0.0.0.0:5000 tuning:app
+    if serve is not None and not debug:
+        serve(app, host='0.0.0.0', port=port, threads=4)
+    else:
+        app.run(host='0.0.0.0', port=port, debug=debug)
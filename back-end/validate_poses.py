@@ -6,16 +6,106 @@ Compares all images in testing_images folder against the baseline.
 import os
 import sys
 import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # Optional; falls back to the stdlib json module
+    orjson = None
+
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(__file__))
 
-from baseline_collector import collect_baseline_from_folder
+from baseline_collector import collect_baseline_from_folder, load_json
 from pose_comparator import PoseComparator
+from drawingLines import warmup
+
+
+# Comparison settings shared by the main process and the worker pool
+COMPARATOR_SETTINGS = {
+    'position_threshold': 0.15,  # 15% position tolerance
+    'angle_threshold': 20.0,     # 20 degree angle tolerance
+    'accuracy_threshold': 70.0   # 70% to be considered accurate
+}
+
+# Per-process comparator used by the validation worker pool
+_worker_comparator = None
+
 
+def _init_worker(baseline_file):
+    """Load the baseline and initialize the pose graph once per worker process."""
+    global _worker_comparator
+    _worker_comparator = PoseComparator(baseline_path=baseline_file, **COMPARATOR_SETTINGS)
+    _worker_comparator.load_baseline()
+    warmup(detect_hands=False)
 
-def run_validation():
+
+def _compare_in_worker(image_path):
+    """Compare one test image inside a worker process and return its flag."""
+    result = _worker_comparator.compare_image_file(image_path)
+    return _worker_comparator.get_comparison_flag(result)
+
+
+def _compare_all(comparator, image_paths, baseline_file, max_workers=None):
+    """
+    Yield the comparison flag of every test image, in input order.
+    
+    MediaPipe inference is CPU-bound, so images are spread across worker
+    processes, each with its own comparator (spawned, as MediaPipe graphs are
+    not fork-safe). With one worker the main process comparator is used.
+    """
+    workers = min(max_workers or os.cpu_count() or 1, len(image_paths))
+    
+    if workers <= 1:
+        for image_path in image_paths:
+            yield comparator.get_comparison_flag(comparator.compare_image_file(image_path))
+        return
+    
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(baseline_file,)
+    ) as executor:
+        yield from executor.map(_compare_in_worker, image_paths)
+
+
+def _load_fresh_baseline(baseline_file, baseline_folder, baseline_images):
+    """
+    Load the saved baseline if it was collected from these baseline images and
+    is newer than them.
+    
+    correctForm's /collect-baseline writes the same file for any folder, so
+    the source folder and processed files are checked as well as the mtime.
+    
+    Returns:
+        The baseline data, or None if it has to be collected again
+    """
+    if not os.path.exists(baseline_file):
+        return None
+    
+    # The folder's own mtime changes when images are added, removed or renamed
+    paths = [baseline_folder] + [os.path.join(baseline_folder, f) for f in baseline_images]
+    if os.path.getmtime(baseline_file) <= max(os.path.getmtime(path) for path in paths):
+        return None
+    
+    baseline = load_json(baseline_file)
+    metadata = baseline.get('metadata') or {}
+    if metadata.get('aggregate_method') != 'average' or 'processed_files' not in metadata:
+        return None
+    
+    source_folder = metadata.get('source_folder')
+    if not source_folder or os.path.realpath(source_folder) != os.path.realpath(baseline_folder):
+        return None
+    if not set(metadata['processed_files']) <= set(baseline_images):
+        return None
+    
+    return baseline
+
+
+def run_validation(max_workers=None):
     script_dir = os.path.dirname(__file__)
     baseline_folder = os.path.join(script_dir, 'baseline_images')
     testing_folder = os.path.join(script_dir, 'testing_images')
@@ -37,24 +127,23 @@ def run_validation():
                        if f.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp', '.webp'))]
     print(f"Found {len(baseline_images)} baseline images")
     
-    baseline = collect_baseline_from_folder(
-        baseline_folder,
-        baseline_file,
-        aggregate_method='average'
-    )
-    print(f"✓ Baseline created from {baseline['metadata']['num_images_processed']} images\n")
+    baseline = _load_fresh_baseline(baseline_file, baseline_folder, baseline_images)
+    if baseline is not None:
+        print(f"✓ Baseline is up to date ({baseline['metadata']['num_images_processed']} images), skipping collection\n")
+    else:
+        baseline = collect_baseline_from_folder(
+            baseline_folder,
+            baseline_file,
+            aggregate_method='average'
+        )
+        print(f"✓ Baseline created from {baseline['metadata']['num_images_processed']} images\n")
     
     # Step 2: Load comparator
     print("-" * 60)
     print("STEP 2: Initializing pose comparator...")
     print("-" * 60)
     
-    comparator = PoseComparator(
-        baseline_path=baseline_file,
-        position_threshold=0.15,  # 15% position tolerance
-        angle_threshold=20.0,     # 20 degree angle tolerance
-        accuracy_threshold=70.0   # 70% to be considered accurate
-    )
+    comparator = PoseComparator(baseline_path=baseline_file, **COMPARATOR_SETTINGS)
     comparator.load_baseline()
     print("✓ Comparator ready\n")
     
@@ -74,31 +163,23 @@ def run_validation():
     
     results = []
     
-    for i, filename in enumerate(sorted(test_images), 1):
-        image_path = os.path.join(testing_folder, filename)
+    test_images = sorted(test_images)
+    image_paths = [os.path.join(testing_folder, filename) for filename in test_images]
+    flags = _compare_all(comparator, image_paths, baseline_file, max_workers)
+    
+    for i, (filename, flag) in enumerate(zip(test_images, flags), 1):
         print(f"\n[{i}/{len(test_images)}] Testing: {filename}")
         print("-" * 40)
         
-        result = comparator.compare_image_file(image_path)
-        flag = comparator.get_comparison_flag(result)
-        
-        # Ensure corrections are JSON serializable
-        serializable_corrections = [
-            {
-                'arm': correction['arm'],
-                'joint': correction['joint'],
-                'message': correction['message']
-            }
-            for correction in flag['corrections']
-        ]
-
+        # get_comparison_flag already builds plain Python values, so the
+        # flag is stored as-is without a serializability pass
         results.append({
             'filename': filename,
             'accuracy': flag['accuracy_percentage'],
             'level': flag['accuracy_level'],
             'is_accurate': flag['is_accurate'],
             'message': flag['message'],
-            'corrections': serializable_corrections
+            'corrections': flag['corrections']
         })
         
         # Print results
@@ -137,33 +218,27 @@ def run_validation():
         status = "PASS" if r['is_accurate'] else "FAIL"
         print(f"{r['filename']:<40} {r['accuracy']:>9.1f}% {status:>10}")
     
-    # Ensure all objects in results are JSON serializable
-    def make_serializable(obj):
-        try:
-            json.dumps(obj)  # Test if serializable
-            return obj
-        except (TypeError, ValueError):
-            return str(obj)  # Fallback to string representation
-
-    results = [
-        {key: make_serializable(value) for key, value in result.items()}
-        for result in results
-    ]
-    
-    # Save results to JSON
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'baseline_images': baseline['metadata']['processed_files'],
+        'summary': {
+            'total_tested': total,
+            'passed': passed,
+            'failed': failed,
+            'average_accuracy': avg_accuracy
+        },
+        'results': results
+    }
+    
+    # Save results to JSON; anything not JSON serializable falls back to str()
     output_file = os.path.join(script_dir, 'output', 'validation_results.json')
-    with open(output_file, 'w') as f:
-        json.dump({
-            'timestamp': datetime.now().isoformat(),
-            'baseline_images': baseline['metadata']['processed_files'],
-            'summary': {
-                'total_tested': total,
-                'passed': passed,
-                'failed': failed,
-                'average_accuracy': avg_accuracy
-            },
-            'results': results
-        }, f, indent=2)
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(report, default=str,
+                                 option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(output_file, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
     
     print(f"\n✓ Results saved to: {output_file}")
     
@@ -2,6 +2,7 @@
 from flask import Flask
 from flask_socketio import SocketIO, emit
 import base64
+import binascii
 import cv2
 import numpy as np
 
@@ -40,6 +41,12 @@ ARM_LINE_THICKNESS = 3
 POINT_COLOR = (61, 2, 20)  # Red in BGR // NOTE: temp switch to WHITE
 POINT_RADIUS = 5
 
+# Quality of the processed frames sent back over the socket. The client already
+# sends ~60% quality JPEGs, so re-encoding at OpenCV's default 95 only inflates
+# the payload (~4x at 960x540) and the encode time.
+JPEG_QUALITY = 70
+JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]
+
 # Model paths
 POSE_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'pose_landmarker.task')
 HAND_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'hand_landmarker.task')
@@ -271,11 +278,14 @@ def process_image(image):
     """
     Process an image to detect arms and draw lines.
     
+    Lines are drawn onto the input image itself, so pass a copy if the
+    original frame is still needed.
+    
     Args:
         image: Input image as numpy array (BGR format)
     
     Returns:
-        processed_image: Image with arm lines drawn
+        processed_image: Image with arm lines drawn (the input image)
         result: Dictionary with detection results
     """
     timestamp_ms = int(time.time() * 1000)
@@ -309,9 +319,9 @@ def process_image(image):
     if hand_results.hand_landmarks:
         hand_landmarks_list = hand_results.hand_landmarks
     
-    # Draw arm lines
+    # Draw arm lines; the landmarks are already detected, so draw in place
     processed_image, arms_detected = draw_arm_lines(
-        image.copy(),
+        image,
         pose_landmarks,
         hand_landmarks_list,
         image_width,
@@ -499,19 +509,21 @@ def handle_disconnect():
 def handle_video_frame(data):
     # data is a base64-encoded JPEG data URL (e.g., "data:image/jpeg;base64,...")
     if data.startswith('data:image'):
-        # Extract base64 part
-        img_b64 = data.split(',')[1]
+        # Extract base64 part without splitting the whole payload
+        img_b64 = data[data.find(',') + 1:]
     else:
         img_b64 = data
     
-    # Decode to bytes
-    img_bytes = base64.b64decode(img_b64)
+    # Decode to bytes; binascii takes the ASCII str directly, skipping the
+    # bytes conversion base64.b64decode does first
+    img_bytes = binascii.a2b_base64(img_b64)
     
     # Convert to numpy array and decode with OpenCV
     nparr = np.frombuffer(img_bytes, np.uint8)
     frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
     
     if frame is not None:
+        # The decoded frame is only used here, so the overlay is drawn onto it
         start_time = time.perf_counter()
         processed_frame, frame_landmarks = process_image(frame)   # shoulders, arms, etc.
         end_time = time.perf_counter()
@@ -520,8 +532,8 @@ def handle_video_frame(data):
         
 
         # Encode and send processed frame back
-        _, buffer = cv2.imencode('.jpg', processed_frame)
-        processed_b64 = base64.b64encode(buffer).decode('utf-8')
+        _, buffer = cv2.imencode('.jpg', processed_frame, JPEG_PARAMS)
+        processed_b64 = binascii.b2a_base64(buffer, newline=False).decode('ascii')
         data_url = f'data:image/jpeg;base64,{processed_b64}'
 
         height, width = frame.shape[:2]